@@ -0,0 +1,698 @@
+"""네이버/쿠팡 수집 스크립트 공용 모듈 (표준 라이브러리만 필요 - openpyxl 은 설치돼 있으면 색상표에 사용)
+
+키워드 색상 규칙/매처, 적응형 스크롤, 로컬 수집 저장소(SQLite), 진행 게이지 갱신 채널을 스크립트들이 함께 쓴다.
+"""
+import asyncio
+import colorsys
+import os
+import re
+import sqlite3
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime
+
+try:
+    from openpyxl.styles.colors import COLOR_INDEX
+except ImportError:  # 엑셀 키워드 추출을 쓰지 않는 스크립트(쿠팡)는 openpyxl 없이도 import 가능
+    COLOR_INDEX = ()
+
+# ===== 키워드 색상 규칙 =====
+# 색상 이름 -> RGB 판정 (KEYWORD_COLOR_RULES 에서 사용)
+KEYWORD_COLOR_CLASSES = {
+    # 빨간색 계열 판단 (빨간색이 가장 강한 색상)
+    'red': lambda r, g, b: r > g and r > b and r > 150,
+    'orange': lambda r, g, b: r > 200 and 100 <= g <= 200 and b < 100,
+    'yellow': lambda r, g, b: r > 180 and g > 180 and b < 140,
+    'green': lambda r, g, b: g > r and g > b and g > 120,
+    'blue': lambda r, g, b: b > r and b > g and b > 150,
+}
+DEFAULT_KEYWORD_COLOR_RULES = 'red=must'
+DEFAULT_KEYWORD_GROUP = 'must'
+# 테마 색상 인덱스 순서 (Excel 은 lt1/dk1, lt2/dk2 순서를 바꿔 참조)
+THEME_COLOR_ORDER = ('lt1', 'dk1', 'lt2', 'dk2', 'accent1', 'accent2', 'accent3',
+                     'accent4', 'accent5', 'accent6', 'hlink', 'folHlink')
+
+def parse_color_rules(spec=None):
+    """색상 규칙 파싱 - 'red=must,yellow=watch,#FFC000=watch' -> [(색상, 그룹)] (앞선 규칙 우선)"""
+    if spec is None:
+        spec = os.getenv('KEYWORD_COLOR_RULES') or DEFAULT_KEYWORD_COLOR_RULES
+    rules = []
+    for item in spec.split(','):
+        color, _, group = item.partition('=')
+        color = color.strip().lower().lstrip('#')
+        group = group.strip() or DEFAULT_KEYWORD_GROUP
+        if color in KEYWORD_COLOR_CLASSES or re.fullmatch(r'[0-9a-f]{6}', color):
+            rules.append((color, group))
+        elif color:
+            print(f"알 수 없는 색상 규칙 무시: {item.strip()}")
+    return tuple(rules) or (('red', DEFAULT_KEYWORD_GROUP),)
+
+def parse_theme_colors(theme_xml):
+    """테마 XML 에서 색상표 추출 -> 테마 인덱스 순 'RRGGBB' 목록"""
+    if not theme_xml:
+        return []
+    try:
+        root = ET.fromstring(theme_xml)
+    except Exception:
+        return []
+    colors = {}
+    for scheme in root.iter():
+        if not scheme.tag.endswith('}clrScheme'):
+            continue
+        for child in scheme:
+            name = child.tag.split('}')[-1]
+            for value in child:
+                rgb = value.get('lastClr') or value.get('val')
+                if rgb and len(rgb) == 6:
+                    colors[name] = rgb.upper()
+        break
+    return [colors.get(name) for name in THEME_COLOR_ORDER]
+
+def apply_tint(rgb, tint):
+    """Excel 명도(tint) 보정 적용"""
+    if not tint:
+        return rgb
+    r, g, b = (int(rgb[i:i + 2], 16) / 255 for i in (0, 2, 4))
+    h, l, s = colorsys.rgb_to_hls(r, g, b)
+    l = l * (1 + tint) if tint < 0 else l * (1 - tint) + tint
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return '%02X%02X%02X' % tuple(int(round(c * 255)) for c in (r, g, b))
+
+class ColorResolver:
+    """셀 색상(rgb/indexed/theme + tint)을 'RRGGBB' 로 변환하고 규칙 그룹을 판정 (결과 캐시)"""
+
+    def __init__(self, rules, theme_colors=None, indexed_colors=None):
+        self.rules = tuple(rules)
+        self.theme_colors = list(theme_colors or [])
+        self.indexed_colors = list(indexed_colors or COLOR_INDEX)
+        self._rgb_cache = {}
+        self._group_cache = {}
+
+    @classmethod
+    def for_workbook(cls, workbook, rules):
+        theme_colors = parse_theme_colors(getattr(workbook, 'loaded_theme', None))
+        return cls(rules, theme_colors, getattr(workbook, '_colors', None))
+
+    def resolve(self, color):
+        """openpyxl Color -> 'RRGGBB' (해석 불가 시 None)"""
+        if color is None:
+            return None
+        kind = getattr(color, 'type', None)
+        tint = getattr(color, 'tint', 0) or 0
+        value = getattr(color, kind, None) if kind in ('rgb', 'indexed', 'theme') else None
+        key = (kind, value, tint)
+        if key in self._rgb_cache:
+            return self._rgb_cache[key]
+
+        rgb = None
+        if kind == 'rgb' and isinstance(value, str) and len(value) in (6, 8):
+            rgb = value[-6:].upper()
+        elif kind == 'indexed' and isinstance(value, int) and 0 <= value < len(self.indexed_colors):
+            rgb = str(self.indexed_colors[value])[-6:].upper()
+        elif kind == 'theme' and isinstance(value, int) and 0 <= value < len(self.theme_colors):
+            rgb = self.theme_colors[value]
+        if rgb and not re.fullmatch(r'[0-9A-F]{6}', rgb):
+            rgb = None
+        if rgb and tint:
+            rgb = apply_tint(rgb, tint)
+        self._rgb_cache[key] = rgb
+        return rgb
+
+    def group_for_rgb(self, rgb):
+        if rgb is None:
+            return None
+        if rgb not in self._group_cache:
+            r, g, b = (int(rgb[i:i + 2], 16) for i in (0, 2, 4))
+            group = None
+            for color, rule_group in self.rules:
+                check = KEYWORD_COLOR_CLASSES.get(color)
+                if (check(r, g, b) if check else color.upper() == rgb):
+                    group = rule_group
+                    break
+            self._group_cache[rgb] = group
+        return self._group_cache[rgb]
+
+    def group_for_fill(self, fill):
+        """단색 배경 채우기의 규칙 그룹 (해당 없음: None)"""
+        if fill is None or fill.fill_type != 'solid':
+            return None
+        return self.group_for_rgb(self.resolve(fill.start_color))
+
+# ===== 키워드 매처 =====
+def _fold(text):
+    """대소문자 무시 비교용 정규화 (글자 수가 바뀌는 소문자 변환은 원문 유지 - 위치 대응 보장)"""
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+class KeywordMatcher:
+    """Aho–Corasick 다중 패턴 매처 (대소문자 무시, 부분 일치)
+
+    키워드 집합마다 1회 구축해 매칭/집계/하이라이트가 공유하며, 텍스트는 키워드 수와 관계없이 한 번만 훑는다.
+    패턴 번호는 키워드 목록에서 처음 나온 순서이다. groups 는 키워드별 그룹(색상 규칙)으로,
+    같은 패턴이 여러 그룹에 있으면 먼저 나온 키워드의 그룹을 따른다.
+    """
+
+    def __init__(self, keywords, groups=None):
+        keywords = list(keywords or [])
+        groups = list(groups) if groups is not None else [DEFAULT_KEYWORD_GROUP] * len(keywords)
+        pairs = [(kw, group) for kw, group in zip(keywords, groups) if kw and kw.strip()]
+        self.keywords = [kw for kw, _ in pairs]
+        self.patterns = []
+        self.pattern_keywords = []  # 패턴 번호 -> 같은 패턴으로 정규화되는 원본 키워드들
+        self.pattern_groups = []  # 패턴 번호 -> 그룹
+        self.groups = list(dict.fromkeys(group for _, group in pairs))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        
+        pattern_ids = {}
+        for kw, group in pairs:
+            norm = _fold(kw.strip())
+            pid = pattern_ids.get(norm)
+            if pid is None:
+                pid = pattern_ids[norm] = len(self.patterns)
+                self.patterns.append(norm)
+                self.pattern_keywords.append([])
+                self.pattern_groups.append(group)
+                self._add_pattern(norm, pid)
+            self.pattern_keywords[pid].append(kw)
+        self._build_fail_links()
+        
+        # 하이라이트 우선순위: 원본 키워드 길이 내림차순 (동일 길이는 목록 순서)
+        self._priority = []
+        for kw in sorted(self.keywords, key=len, reverse=True):
+            pid = pattern_ids[_fold(kw.strip())]
+            if pid not in self._priority:
+                self._priority.append(pid)
+
+    def _add_pattern(self, pattern, pid):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (pid,)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def iter_matches(self, text):
+        """(시작, 끝, 패턴 번호) 를 끝 위치 순으로 반환"""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        node = 0
+        for i, ch in enumerate(_fold(text or '')):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                yield i + 1 - len(patterns[pid]), i + 1, pid
+
+    def match_summary(self, *texts):
+        """한 번의 훑기로 (가장 앞선 패턴 번호, 매칭된 그룹 목록[규칙 순서]) 반환"""
+        best = None
+        matched_groups = set()
+        for text in texts:
+            for _, _, pid in self.iter_matches(text):
+                matched_groups.add(self.pattern_groups[pid])
+                if best is None or pid < best:
+                    best = pid
+        return best, [group for group in self.groups if group in matched_groups]
+
+    def is_match(self, *texts):
+        for text in texts:
+            for _ in self.iter_matches(text):
+                return True
+        return False
+
+    def highlight_spans(self, text):
+        """하이라이트할 (시작, 끝) 구간 목록 - 우선순위 높은 키워드부터 왼쪽부터 겹치지 않게 선택"""
+        occurrences = {}
+        for start, end, pid in self.iter_matches(text):
+            occurrences.setdefault(pid, []).append((start, end))
+        if not occurrences:
+            return []
+        
+        taken = bytearray(len(text))
+        spans = []
+        for pid in self._priority:
+            last_end = 0
+            for start, end in occurrences.get(pid, ()):
+                if start < last_end or taken.find(1, start, end) != -1:
+                    continue
+                taken[start:end] = b'\x01' * (end - start)
+                spans.append((start, end))
+                last_end = end
+        spans.sort()
+        return spans
+
+_matcher_cache = {}
+_keyword_groups = {}  # 키워드 -> 그룹 (엑셀 색상 규칙으로 추출 시 등록)
+
+def set_keyword_groups(groups):
+    """키워드별 그룹 등록 (등록되지 않은 키워드는 기본 그룹)"""
+    _keyword_groups.clear()
+    _keyword_groups.update(groups or {})
+
+def get_keyword_groups():
+    """등록된 키워드별 그룹 (복사본 - 다른 프로세스로 넘길 때 사용)"""
+    return dict(_keyword_groups)
+
+def matcher_cache_key(keywords, groups=None):
+    keywords = tuple(keywords or ())
+    groups = _keyword_groups if groups is None else groups
+    return keywords, tuple(groups.get(kw, DEFAULT_KEYWORD_GROUP) for kw in keywords)
+
+def get_keyword_matcher(keywords, groups=None):
+    """키워드 집합(과 그룹)별로 한 번만 구축한 매처 반환 (groups: 키워드 -> 그룹, 기본: 등록된 그룹)"""
+    key = matcher_cache_key(keywords, groups)
+    matcher = _matcher_cache.get(key)
+    if matcher is None:
+        if len(_matcher_cache) >= 8:
+            _matcher_cache.clear()
+        matcher = _matcher_cache[key] = KeywordMatcher(*key)
+    return matcher
+
+def must_match_groups(groups):
+    """'매칭'(필수 일치)으로 볼 그룹 - KEYWORD_MUST_GROUPS (쉼표 구분, 기본 must), 없으면 첫 규칙의 그룹"""
+    names = {g.strip() for g in (os.getenv('KEYWORD_MUST_GROUPS') or DEFAULT_KEYWORD_GROUP).split(',') if g.strip()}
+    groups = list(groups)
+    return {g for g in groups if g in names} or set(groups[:1])
+
+def group_match_column(group):
+    """그룹별 매칭 여부 컬럼명"""
+    return f"매칭_{group}"
+
+# ===== 적응형 스크롤 =====
+class ScrollController:
+    """카드 도착 속도에 맞춰 스크롤 폭/대기 시간을 조정하고 수집 종료 시점을 판단
+
+    step 은 화면 높이 대비 스크롤 폭, wait 는 스크롤 후 대기(초). 새 카드가 들어오면 폭을 늘리고 대기를 줄이며,
+    바닥에서 새 카드가 없으면 대기를 늘려 로딩을 기다리다가 idle_limit 회 연속이면 피드 끝으로 본다.
+    더보기 클릭은 more_grace 라운드 안에 새 카드가 들어와야 성과로 인정하고, 성과 없는 클릭이
+    max_fruitless_clicks 회 쌓이면 더 이상 클릭하지 않는다. max_rounds 는 어떤 경우에도 넘지 않는 상한.
+    """
+
+    def __init__(self, time_budget=0, product_budget=0, step=0.8, wait=1.0,
+                 max_step=3.0, min_wait=0.25, max_wait=3.0, idle_wait=1.0, idle_limit=4,
+                 more_grace=2, max_fruitless_clicks=2, max_rounds=2000):
+        self.time_budget = time_budget
+        self.product_budget = product_budget
+        self.step = step
+        self.wait = wait
+        self.max_step = max_step
+        self.min_wait, self.max_wait = min_wait, max_wait
+        self.idle_wait = idle_wait
+        self.idle_limit = idle_limit
+        self.more_grace = more_grace
+        self.max_fruitless_clicks = max_fruitless_clicks
+        self.max_rounds = max_rounds
+        self.started = time.monotonic()
+        self.rounds = 0
+        self.idle_rounds = 0
+        self.more_pending = 0  # 직전 더보기 클릭의 결과를 기다리는 남은 라운드
+        self.fruitless_clicks = 0  # 새 카드 없이 끝난 더보기 클릭 수
+        self.clear_more_marks = False
+        self.stop_reason = None
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """SCROLL_TIME_BUDGET(초)/SCROLL_PRODUCT_BUDGET(개) 한도 적용 (0: 무제한), SCROLL_MAX_ROUNDS 로 상한 변경"""
+        def number(name):
+            try:
+                return max(0.0, float(os.getenv(name, '0') or 0))
+            except ValueError:
+                return 0.0
+        kwargs = dict(time_budget=number('SCROLL_TIME_BUDGET'), product_budget=int(number('SCROLL_PRODUCT_BUDGET')))
+        if number('SCROLL_MAX_ROUNDS'):
+            kwargs['max_rounds'] = int(number('SCROLL_MAX_ROUNDS'))
+        kwargs.update(overrides)
+        return cls(**kwargs)
+
+    def more_options(self):
+        """FEED_SCROLL_JS 에 넘길 더보기 옵션 (클릭 허용 여부, 클릭 표시 초기화 여부)"""
+        clear, self.clear_more_marks = self.clear_more_marks, False
+        allow = not self.more_pending and self.fruitless_clicks < self.max_fruitless_clicks
+        return {'allowMore': allow, 'clearMore': clear}
+
+    def observe(self, new_items, total, at_bottom=False, end_of_feed=False, clicked_more=False):
+        """직전 스크롤 결과 반영 -> 계속 스크롤하면 True (종료 사유는 stop_reason)"""
+        self.rounds += 1
+        if clicked_more:
+            self.more_pending = self.more_grace
+        if new_items > 0:
+            if self.more_pending or self.fruitless_clicks:
+                # 클릭이 성과를 냈으므로 같은 버튼도 다시 누를 수 있게 함
+                self.clear_more_marks = True
+            self.more_pending = 0
+            self.fruitless_clicks = 0
+            self.idle_rounds = 0
+            self.step = min(self.max_step, self.step * 1.25)
+            self.wait = max(self.min_wait, self.wait * 0.8)
+            return self._check_stop(new_items, total, end_of_feed)
+        
+        if self.more_pending:
+            self.more_pending -= 1
+            if not self.more_pending:
+                self.fruitless_clicks += 1
+        if at_bottom:
+            # 바닥에서 새 카드 없음: 다음 목록 로딩을 점점 더 오래 기다림
+            self.idle_rounds += 1
+            self.wait = min(self.max_wait, max(self.idle_wait, self.wait * 1.6))
+        else:
+            # 이미 렌더링된 구간: 대기 없이 크게 넘김
+            self.step = min(self.max_step, self.step * 1.25)
+            self.wait = self.min_wait
+        return self._check_stop(new_items, total, end_of_feed)
+
+    def _check_stop(self, new_items, total, end_of_feed):
+        if self.product_budget and total >= self.product_budget:
+            self.stop_reason = f"상품 수 한도 도달 ({total}/{self.product_budget})"
+        elif self.time_budget and time.monotonic() - self.started >= self.time_budget:
+            self.stop_reason = f"시간 한도 도달 ({self.time_budget:g}s)"
+        elif end_of_feed and new_items == 0:
+            self.stop_reason = "피드 끝 표시 감지"
+        elif self.idle_rounds >= self.idle_limit:
+            self.stop_reason = f"바닥에서 새 카드 없음 ({self.idle_rounds}회)"
+        elif self.max_rounds and self.rounds >= self.max_rounds:
+            self.stop_reason = f"최대 스크롤 횟수 도달 ({self.max_rounds}회)"
+        return self.stop_reason is None
+
+# 사이트별 피드 끝/더보기 판정 셀렉터 (마지막 상품 카드 아래에 보이는 요소만 인정)
+#   moreScope: 더보기 버튼을 찾을 검색 결과 영역 (마지막 카드의 조상 중 앞선 셀렉터 우선, None: 문서 전체)
+FEED_SELECTORS = {
+    'naver': {
+        'end': '[class*="noResult"], [class*="no_result"], [class*="endOfList"], [class*="list_end"]',
+        'more': 'button, a[role="button"]',
+        'moreScope': None,
+    },
+    'coupang': {
+        # 페이지 이동 영역 = 이 페이지 목록 로딩 완료
+        'end': ".search-pagination, [class*='pagination'], [class*='Pagination']",
+        # 푸터 링크 등을 누르지 않도록 검색 결과 영역 안의 버튼만
+        'more': "button, a[role='button']",
+        'moreScope': ['#searchProductResult', '#productList', 'ul.search-product-list'],
+    },
+}
+FEED_MORE_TEXT = '더보기|더 보기'
+
+# 더보기 버튼 클릭/피드 끝 표시 확인 후 step * 화면 높이만큼 스크롤 -> {atBottom, end, more}
+# 클릭한 버튼은 data-pc-more 로 표시해 다시 누르지 않음 (clearMore: 새 카드가 들어온 뒤 표시 초기화)
+FEED_SCROLL_JS = """
+(args) => {
+    const cards = document.querySelectorAll(args.card);
+    const last = cards.length ? cards[cards.length - 1] : null;
+    const floor = last ? last.getBoundingClientRect().bottom - 1 : -Infinity;
+    const below = (el) => el.offsetParent !== null && el.getBoundingClientRect().top >= floor;
+    const moreText = new RegExp(args.moreText, 'i');
+    let scope = args.moreScope ? null : document;
+    for (const sel of args.moreScope || []) {
+        scope = last && last.closest(sel);
+        if (scope) break;
+    }
+    if (args.clearMore) {
+        document.querySelectorAll('[data-pc-more]').forEach(el => el.removeAttribute('data-pc-more'));
+    }
+    let more = false;
+    if (args.allowMore && scope) {
+        for (const el of scope.querySelectorAll(args.more)) {
+            if (el.disabled || el.hasAttribute('data-pc-more')) continue;
+            if (below(el) && moreText.test((el.textContent || '').trim())) {
+                el.setAttribute('data-pc-more', '1');
+                el.click();
+                more = true;
+                break;
+            }
+        }
+    }
+    const end = Array.from(document.querySelectorAll(args.end)).some(below);
+    window.scrollBy(0, window.innerHeight * args.step);
+    const atBottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 2;
+    return { atBottom, end, more };
+}
+"""
+# Selenium execute_script 용 (스크립트 본문에서 arguments[0] 으로 인자 전달)
+FEED_SCROLL_CALL_JS = "return (" + FEED_SCROLL_JS.strip() + ")(arguments[0]);"
+
+def feed_scroll_args(site, card, controller):
+    """FEED_SCROLL_JS 인자 - 사이트 셀렉터 + 현재 스크롤 폭/더보기 옵션"""
+    selectors = FEED_SELECTORS[site]
+    return {
+        'card': card,
+        'end': selectors['end'],
+        'more': selectors['more'],
+        'moreScope': selectors['moreScope'],
+        'moreText': FEED_MORE_TEXT,
+        'step': controller.step,
+        **controller.more_options(),
+    }
+
+# ===== 로컬 수집 저장소 (SQLite) =====
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    name TEXT,
+    mall TEXT,
+    link TEXT,
+    thumbnail TEXT,
+    price TEXT,
+    delivery TEXT,
+    query TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 1,
+    last_run TEXT,
+    first_price INTEGER,
+    last_price INTEGER,
+    last_delivery INTEGER,
+    prev_price INTEGER,
+    prev_delivery INTEGER,
+    min_price INTEGER,
+    max_price INTEGER
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    product_key TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    price TEXT,
+    delivery TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_price_history_key ON price_history (product_key, observed_at);
+"""
+# 이번 실행 식별자 - 배치 검색어가 겹쳐 같은 상품이 여러 번 저장돼도 관측은 실행당 한 번만 센다
+STORE_RUN_ID = f"{datetime.now():%Y%m%d%H%M%S}-{os.getpid()}"
+# products 의 숫자 가격 요약(첫/직전/최근/최저/최고)은 upsert 와 함께 갱신 - 조회 시 가격 이력 전체를 훑지 않음
+STORE_UPSERT_SQL = """
+INSERT INTO products (product_key, source, name, mall, link, thumbnail, price, delivery, query, first_seen, last_seen,
+                      last_run, first_price, last_price, last_delivery, min_price, max_price)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (product_key) DO UPDATE SET
+    name = COALESCE(excluded.name, products.name),
+    link = COALESCE(excluded.link, products.link),
+    thumbnail = COALESCE(NULLIF(excluded.thumbnail, ''), products.thumbnail),
+    price = excluded.price,
+    delivery = excluded.delivery,
+    query = COALESCE(excluded.query, products.query),
+    last_seen = excluded.last_seen,
+    seen_count = products.seen_count + 1,
+    last_run = excluded.last_run,
+    first_price = COALESCE(products.first_price, excluded.last_price),
+    prev_price = products.last_price,
+    prev_delivery = products.last_delivery,
+    last_price = excluded.last_price,
+    last_delivery = excluded.last_delivery,
+    min_price = CASE WHEN excluded.last_price IS NOT NULL AND (products.min_price IS NULL OR excluded.last_price < products.min_price)
+                     THEN excluded.last_price ELSE products.min_price END,
+    max_price = CASE WHEN excluded.last_price IS NOT NULL AND (products.max_price IS NULL OR excluded.last_price > products.max_price)
+                     THEN excluded.last_price ELSE products.max_price END
+"""
+
+def open_product_store(path):
+    """저장소 연결 (폴더/테이블이 없으면 생성)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(STORE_SCHEMA)
+    return conn
+
+def _price_int(value):
+    digits = re.sub(r'[^\d]', '', str(value or ''))
+    return int(digits) if digits else None
+
+def upsert_store_records(records, path, run_id=None):
+    """수집 레코드를 로컬 저장소에 upsert 하고 가격 요약 갱신
+
+    레코드는 product_key/source/name/mall/link/thumbnail/price/delivery/query 키를 가진 dict 이다.
+    같은 상품은 최종 확인 시각만 갱신하고, 처음 보거나 가격/배송비가 바뀐 경우에만 가격 이력을 추가한다.
+    한 실행(run_id, 기본 STORE_RUN_ID)에서 이미 기록한 상품은 다시 세지 않는다.
+    신규/변동/변동없음/중복 개수와 직전 관측 대비 가격·배송비가 바뀐 상품 목록(변동폭 포함)을 반환한다.
+    """
+    run_id = run_id or STORE_RUN_ID
+    now = datetime.now().isoformat(timespec='seconds')
+    stats = {'new': 0, 'changed': 0, 'unchanged': 0, 'duplicate': 0}
+    changes = []
+    conn = open_product_store(path)
+    try:
+        with conn:
+            for record in records:
+                product_key = record['product_key']
+                price = str(record.get('price') or '')
+                delivery = str(record.get('delivery') or '')
+                
+                row = conn.execute(
+                    "SELECT price, delivery, last_run FROM products WHERE product_key = ?", (product_key,)
+                ).fetchone()
+                if row and row[2] == run_id:
+                    stats['duplicate'] += 1
+                    continue
+                previous = (row[0] or '', row[1] or '') if row else None
+                price_value = _price_int(price)
+                delivery_value = _price_int(delivery)
+                if previous is None:
+                    stats['new'] += 1
+                elif previous != (price, delivery):
+                    stats['changed'] += 1
+                    last_price = _price_int(previous[0])
+                    changes.append({
+                        '상품명': record.get('name'),
+                        '판매처': record.get('mall'),
+                        '이전가격': last_price,
+                        '가격': price_value,
+                        '가격변동': price_value - last_price if price_value is not None and last_price is not None else None,
+                        '이전배송비': _price_int(previous[1]),
+                        '배송비': delivery_value,
+                    })
+                else:
+                    stats['unchanged'] += 1
+                
+                conn.execute(STORE_UPSERT_SQL, (
+                    product_key, record['source'], record.get('name'), record.get('mall'), record.get('link'),
+                    record.get('thumbnail') or '', price, delivery, record.get('query'), now, now,
+                    run_id, price_value, price_value, delivery_value, price_value, price_value,
+                ))
+                if previous != (price, delivery):
+                    conn.execute(
+                        "INSERT INTO price_history (product_key, observed_at, price, delivery) VALUES (?, ?, ?, ?)",
+                        (product_key, now, price, delivery),
+                    )
+    finally:
+        conn.close()
+    return stats, changes
+
+def price_summary(path, changed_only=False, limit=None):
+    """상품별 가격 요약 (첫/최근/최저/최고 가격, 직전 대비 변동폭, 관측 횟수) - 변동폭 큰 순"""
+    sql = """
+        SELECT name, mall, first_price, last_price, min_price, max_price,
+               last_price - prev_price AS delta, prev_delivery, last_delivery, seen_count, last_seen
+        FROM products
+    """
+    if changed_only:
+        sql += " WHERE seen_count > 1 AND (last_price IS NOT prev_price OR last_delivery IS NOT prev_delivery)"
+    sql += " ORDER BY ABS(COALESCE(delta, 0)) DESC, last_seen DESC"
+    if limit:
+        sql += f" LIMIT {int(limit)}"
+    conn = open_product_store(path)
+    try:
+        columns = ['상품명', '판매처', '첫가격', '최근가격', '최저가', '최고가', '가격변동', '이전배송비', '배송비', '관측횟수', '최근관측']
+        return [dict(zip(columns, row)) for row in conn.execute(sql)]
+    finally:
+        conn.close()
+
+# 결과 파일(CSV/JSON/HTML) 작성 정책 (RESULT_DUMPS=changed|always|off) - 기본 기록처는 저장소
+#   changed: 저장소 대비 신규/변동 상품이 있을 때만 | always: 매번 | off: 작성 안 함
+RESULT_DUMP_MODES = ('changed', 'always', 'off')
+DEFAULT_RESULT_DUMPS = 'changed'
+
+def get_result_dumps_mode(mode=None):
+    mode = (mode or os.getenv('RESULT_DUMPS') or DEFAULT_RESULT_DUMPS).strip().lower()
+    if mode not in RESULT_DUMP_MODES:
+        print(f"알 수 없는 RESULT_DUMPS({mode}) - {DEFAULT_RESULT_DUMPS} 사용")
+        return DEFAULT_RESULT_DUMPS
+    return mode
+
+def result_dump_skip_reason(stats, mode=None):
+    """결과 파일을 건너뛸 이유 (작성해야 하면 None) - stats 는 저장소 반영 통계 (기록 실패 시 None 이면 작성)"""
+    mode = get_result_dumps_mode(mode)
+    if mode == 'off':
+        return "RESULT_DUMPS=off"
+    if mode == 'changed' and stats is not None and not (stats['new'] or stats['changed']):
+        return "저장소 대비 신규/변동 상품 없음 (RESULT_DUMPS=always 로 항상 작성)"
+    return None
+
+# ===== 진행 게이지 갱신 =====
+PROGRESS_MAX_FPS = 12  # 진행 게이지 초당 최대 갱신 횟수
+
+class ProgressChannel:
+    """진행 게이지 갱신 채널 - 진행 보고를 최신 값 하나로 합쳐 초당 최대 fps 회만 페이지에 반영
+
+    push 는 작업 스레드에서 호출해도 안전하며 즉시 반환한다. 페이지 갱신은 단일 pump 태스크가 순서대로 수행한다.
+    render 는 (퍼센트, 문구) 를 받아 실제로 게이지를 그리는 코루틴 함수이다.
+    """
+
+    def __init__(self, render, fps=PROGRESS_MAX_FPS):
+        self.render = render
+        self.interval = 1.0 / max(1, fps)
+        self.loop = asyncio.get_running_loop()
+        self._lock = threading.Lock()
+        self._latest = None
+        self._text = None
+        self._scheduled = False
+        self._closed = False
+        self._wake = asyncio.Event()
+        self._pump = self.loop.create_task(self._run())
+
+    def push(self, pct, text=None):
+        with self._lock:
+            if text:
+                self._text = text
+            self._latest = (int(pct), self._text)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # 이벤트 루프 종료됨
+
+    def _take(self):
+        with self._lock:
+            value, self._latest = self._latest, None
+            self._scheduled = False
+            return value
+
+    async def _run(self):
+        while not self._closed:
+            await self._wake.wait()
+            self._wake.clear()
+            value = self._take()
+            if value is not None:
+                await self.render(*value)
+                await asyncio.sleep(self.interval)
+
+    async def close(self):
+        """남은 최신 값을 반영하고 pump 태스크 종료"""
+        self._closed = True
+        self._wake.set()
+        try:
+            await self._pump
+        except Exception:
+            pass
+        value = self._take()
+        if value is not None:
+            await self.render(*value)
@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+from crawl_common import ColorResolver, apply_tint, parse_color_rules, parse_theme_colors
+
+THEME_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<a:theme xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main">
+  <a:themeElements>
+    <a:clrScheme name="Office">
+      <a:dk1><a:sysClr val="windowText" lastClr="000000"/></a:dk1>
+      <a:lt1><a:sysClr val="window" lastClr="FFFFFF"/></a:lt1>
+      <a:dk2><a:srgbClr val="44546A"/></a:dk2>
+      <a:lt2><a:srgbClr val="E7E6E6"/></a:lt2>
+      <a:accent1><a:srgbClr val="4472C4"/></a:accent1>
+      <a:accent2><a:srgbClr val="ED7D31"/></a:accent2>
+    </a:clrScheme>
+  </a:themeElements>
+</a:theme>"""
+
+
+def color(kind, value, tint=0):
+    return SimpleNamespace(type=kind, tint=tint, **{kind: value})
+
+
+def solid(start_color):
+    return SimpleNamespace(fill_type='solid', start_color=start_color)
+
+
+def test_parse_color_rules(monkeypatch, capsys):
+    monkeypatch.delenv('KEYWORD_COLOR_RULES', raising=False)
+    assert parse_color_rules() == (('red', 'must'),)
+    assert parse_color_rules('red=must, yellow=watch, #FFC000=watch, purple=x') == (
+        ('red', 'must'), ('yellow', 'watch'), ('ffc000', 'watch'),
+    )
+    assert 'purple=x' in capsys.readouterr().out
+    monkeypatch.setenv('KEYWORD_COLOR_RULES', 'blue')
+    assert parse_color_rules() == (('blue', 'must'),)
+
+
+def test_parse_theme_colors_uses_excel_index_order():
+    colors = parse_theme_colors(THEME_XML)
+    assert colors[:6] == ['FFFFFF', '000000', 'E7E6E6', '44546A', '4472C4', 'ED7D31']
+    assert colors[6] is None
+    assert parse_theme_colors('<broken') == []
+
+
+def test_apply_tint():
+    assert apply_tint('FF0000', 0) == 'FF0000'
+    assert apply_tint('FF0000', -1.0) == '000000'
+    assert apply_tint('FF0000', 1.0) == 'FFFFFF'
+    assert apply_tint('808080', 0.5) == 'C0C0C0'
+
+
+def test_resolve_rgb_indexed_theme():
+    resolver = ColorResolver((('red', 'must'),), parse_theme_colors(THEME_XML), ['00000000', '00FF0000'])
+    assert resolver.resolve(color('rgb', 'FFFF0000')) == 'FF0000'
+    assert resolver.resolve(color('indexed', 1)) == 'FF0000'
+    assert resolver.resolve(color('indexed', 99)) is None
+    assert resolver.resolve(color('theme', 5)) == 'ED7D31'
+    assert resolver.resolve(color('theme', 1, tint=1.0)) == 'FFFFFF'
+    assert resolver.resolve(color('rgb', 'not-a-color')) is None
+    assert resolver.resolve(None) is None
+
+
+def test_group_rules_first_match_wins():
+    resolver = ColorResolver(parse_color_rules('ffc000=watch,red=must,yellow=watch'), indexed_colors=[])
+    assert resolver.group_for_rgb('FF0000') == 'must'
+    assert resolver.group_for_rgb('FFFF00') == 'watch'
+    # 빨강 계열이기도 하지만 앞선 16진 규칙이 우선
+    assert resolver.group_for_rgb('FFC000') == 'watch'
+    assert resolver.group_for_rgb('0000FF') is None
+    assert resolver.group_for_rgb(None) is None
+
+
+def test_group_for_fill_only_solid_fills():
+    resolver = ColorResolver(parse_color_rules('red=must'), indexed_colors=[])
+    assert resolver.group_for_fill(solid(color('rgb', 'FFFF0000'))) == 'must'
+    assert resolver.group_for_fill(SimpleNamespace(fill_type=None, start_color=color('rgb', 'FFFF0000'))) is None
+    assert resolver.group_for_fill(None) is None
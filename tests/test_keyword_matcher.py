@@ -0,0 +1,75 @@
+import pytest
+
+import crawl_common
+from crawl_common import KeywordMatcher, get_keyword_matcher, must_match_groups, set_keyword_groups
+
+
+@pytest.fixture(autouse=True)
+def reset_groups():
+    set_keyword_groups({})
+    crawl_common._matcher_cache.clear()
+    yield
+    set_keyword_groups({})
+    crawl_common._matcher_cache.clear()
+
+
+def test_matches_case_insensitive_substring():
+    matcher = KeywordMatcher(['Gucci', '백'])
+    assert matcher.is_match('GUCCI Marmont')
+    assert matcher.is_match('토트백')
+    assert not matcher.is_match('프라다 지갑')
+
+
+def test_empty_keywords_are_falsy():
+    assert not KeywordMatcher(['', '  '])
+    assert not KeywordMatcher([]).is_match('anything')
+
+
+def test_overlapping_patterns_are_all_reported():
+    matcher = KeywordMatcher(['he', 'she', 'hers'])
+    found = sorted((start, end, matcher.patterns[pid]) for start, end, pid in matcher.iter_matches('ushers'))
+    assert found == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def test_highlight_prefers_longer_keywords_without_overlap():
+    matcher = KeywordMatcher(['가방', '숄더가방'])
+    assert matcher.highlight_spans('숄더가방 가방') == [(0, 4), (5, 7)]
+
+
+def test_match_summary_returns_first_pattern_and_groups_in_rule_order():
+    matcher = KeywordMatcher(['구찌', '프라다', 'GUCCI'], ['must', 'watch', 'watch'])
+    # 같은 패턴으로 정규화되지 않는 키워드는 각자 그룹을 가진다
+    pid, groups = matcher.match_summary('프라다 백', '구찌 공식')
+    assert matcher.patterns[pid] == '구찌'
+    assert groups == ['must', 'watch']
+    assert matcher.match_summary('기타') == (None, [])
+
+
+def test_duplicate_pattern_keeps_first_group():
+    matcher = KeywordMatcher(['Gucci', 'gucci'], ['watch', 'must'])
+    assert matcher.pattern_groups == ['watch']
+    assert matcher.pattern_keywords == [['Gucci', 'gucci']]
+
+
+def test_fold_keeps_positions_for_length_changing_lowercase():
+    # 'İ'.lower() 는 두 글자 - 원문 유지로 하이라이트 위치가 어긋나지 않아야 한다
+    matcher = KeywordMatcher(['bag'])
+    assert matcher.highlight_spans('İBAG') == [(1, 4)]
+
+
+def test_get_keyword_matcher_uses_registered_groups_and_caches():
+    set_keyword_groups({'프라다': 'watch'})
+    matcher = get_keyword_matcher(['구찌', '프라다'])
+    assert matcher.pattern_groups == ['must', 'watch']
+    assert get_keyword_matcher(['구찌', '프라다']) is matcher
+    assert get_keyword_matcher(['구찌', '프라다'], {}) is not matcher
+
+
+def test_must_match_groups(monkeypatch):
+    monkeypatch.delenv('KEYWORD_MUST_GROUPS', raising=False)
+    assert must_match_groups(['must', 'watch']) == {'must'}
+    # must 그룹이 없으면 첫 규칙의 그룹
+    assert must_match_groups(['watch', 'sale']) == {'watch'}
+    monkeypatch.setenv('KEYWORD_MUST_GROUPS', 'watch, sale')
+    assert must_match_groups(['must', 'watch', 'sale']) == {'watch', 'sale'}
+    assert must_match_groups([]) == set()
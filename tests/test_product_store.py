@@ -0,0 +1,103 @@
+import sqlite3
+
+from crawl_common import STORE_SCHEMA, open_product_store, price_summary, result_dump_skip_reason, upsert_store_records
+
+
+def record(key, price, delivery='0', name=None, **extra):
+    return dict({
+        'product_key': f"naver:{key}",
+        'source': 'naver',
+        'name': name or key,
+        'mall': '테스트몰',
+        'thumbnail': '',
+        'price': price,
+        'delivery': delivery,
+        'query': '가방',
+    }, **extra)
+
+
+def history_count(path, key):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM price_history WHERE product_key = ?", (f"naver:{key}",)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_schema_is_idempotent(tmp_path):
+    path = str(tmp_path / "store" / "crawl_store.sqlite3")
+    open_product_store(path).close()
+    conn = open_product_store(path)
+    try:
+        conn.executescript(STORE_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(products)")}
+    finally:
+        conn.close()
+    assert {'last_run', 'first_price', 'last_price', 'prev_price', 'min_price', 'max_price'} <= columns
+
+
+def test_duplicates_within_a_run_are_counted_once(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    stats, changes = upsert_store_records([record('a', '10,000'), record('a', '9,000'), record('b', '5,000')], path, run_id='run1')
+    assert stats == {'new': 2, 'changed': 0, 'unchanged': 0, 'duplicate': 1}
+    assert changes == []
+    assert history_count(path, 'a') == 1
+
+
+def test_price_changes_across_runs(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    upsert_store_records([record('a', '10,000'), record('b', '5,000')], path, run_id='run1')
+    stats, changes = upsert_store_records([record('a', '8,000'), record('b', '5,000')], path, run_id='run2')
+    assert stats == {'new': 0, 'changed': 1, 'unchanged': 1, 'duplicate': 0}
+    assert changes == [{
+        '상품명': 'a', '판매처': '테스트몰', '이전가격': 10000, '가격': 8000, '가격변동': -2000,
+        '이전배송비': 0, '배송비': 0,
+    }]
+    # 가격 이력은 처음 관측과 변동 시에만 추가
+    assert history_count(path, 'a') == 2
+    assert history_count(path, 'b') == 1
+
+    upsert_store_records([record('a', '12,000', delivery='3,000')], path, run_id='run3')
+    rows = {row['상품명']: row for row in price_summary(path)}
+    assert rows['a']['첫가격'] == 10000
+    assert rows['a']['최근가격'] == 12000
+    assert rows['a']['최저가'] == 8000
+    assert rows['a']['최고가'] == 12000
+    assert rows['a']['가격변동'] == 4000
+    assert rows['a']['배송비'] == 3000
+    assert rows['a']['관측횟수'] == 3
+    assert [row['상품명'] for row in price_summary(path, changed_only=True)] == ['a']
+
+
+def test_upsert_keeps_existing_thumbnail(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    upsert_store_records([record('a', '1,000', thumbnail='https://img/a.jpg')], path, run_id='run1')
+    upsert_store_records([record('a', '1,000', thumbnail='')], path, run_id='run2')
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT thumbnail, seen_count FROM products").fetchone() == ('https://img/a.jpg', 2)
+    finally:
+        conn.close()
+
+
+def test_link_and_name_are_kept_when_missing(tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    upsert_store_records([record('p1', '1,000', link='https://www.coupang.com/vp/products/1', source='coupang')], path, run_id='run1')
+    upsert_store_records([record('p1', '1,000', name=None, link=None, source='coupang')], path, run_id='run2')
+    conn = sqlite3.connect(path)
+    try:
+        assert conn.execute("SELECT name, link, source FROM products").fetchone() == ('p1', 'https://www.coupang.com/vp/products/1', 'coupang')
+    finally:
+        conn.close()
+
+
+def test_result_dump_skip_reason(monkeypatch):
+    monkeypatch.delenv('RESULT_DUMPS', raising=False)
+    unchanged = {'new': 0, 'changed': 0, 'unchanged': 3, 'duplicate': 0}
+    assert result_dump_skip_reason(unchanged)
+    assert result_dump_skip_reason(dict(unchanged, changed=1)) is None
+    # 저장소 기록에 실패하면 결과 파일로 남긴다
+    assert result_dump_skip_reason(None) is None
+    assert result_dump_skip_reason(unchanged, 'always') is None
+    monkeypatch.setenv('RESULT_DUMPS', 'off')
+    assert result_dump_skip_reason(None)
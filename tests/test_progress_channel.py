@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+from crawl_common import ProgressChannel
+
+
+def run_channel(scenario, fps=1000):
+    rendered = []
+
+    async def render(pct, text=None):
+        rendered.append((pct, text))
+
+    async def main():
+        channel = ProgressChannel(render, fps=fps)
+        await scenario(channel)
+        await channel.close()
+
+    asyncio.run(main())
+    return rendered
+
+
+def test_bursts_are_coalesced_to_latest_value():
+    async def scenario(channel):
+        for pct in range(100):
+            channel.push(pct, "구성 중")
+        await asyncio.sleep(0.05)
+
+    rendered = run_channel(scenario)
+    assert rendered == [(99, "구성 중")]
+
+
+def test_text_is_kept_until_replaced_and_last_value_flushed_on_close():
+    async def scenario(channel):
+        channel.push(10, "시작")
+        await asyncio.sleep(0.05)
+        channel.push(50)
+        await asyncio.sleep(0.05)
+        channel.push(100, "완료")
+
+    rendered = run_channel(scenario)
+    assert rendered[0] == (10, "시작")
+    assert rendered[1] == (50, "시작")
+    assert rendered[-1] == (100, "완료")
+
+
+def test_push_from_worker_thread():
+    async def scenario(channel):
+        worker = threading.Thread(target=lambda: [channel.push(pct) for pct in range(1, 51)])
+        worker.start()
+        await asyncio.get_running_loop().run_in_executor(None, worker.join)
+        await asyncio.sleep(0.05)
+
+    rendered = run_channel(scenario)
+    assert rendered and rendered[-1][0] == 50
+    assert len(rendered) < 50
+    assert [pct for pct, _ in rendered] == sorted(pct for pct, _ in rendered)
+
+
+def test_fps_limits_render_rate():
+    async def scenario(channel):
+        for pct in range(20):
+            channel.push(pct)
+            await asyncio.sleep(0.01)
+
+    rendered = run_channel(scenario, fps=10)
+    # 0.2초 동안 10fps -> 두세 번 + 종료 시 마지막 값
+    assert len(rendered) <= 4
+    assert rendered[-1][0] == 19
@@ -0,0 +1,113 @@
+import pytest
+
+from crawl_common import FEED_SCROLL_CALL_JS, FEED_SCROLL_JS, ScrollController, feed_scroll_args
+
+
+def test_new_cards_widen_step_and_shorten_wait():
+    controller = ScrollController(step=1.0, wait=1.0)
+    assert controller.observe(10, 10)
+    assert controller.step == pytest.approx(1.25)
+    assert controller.wait == pytest.approx(0.8)
+    for _ in range(20):
+        controller.observe(10, 10)
+    assert controller.step == controller.max_step
+    assert controller.wait == controller.min_wait
+
+
+def test_rendered_area_without_new_cards_skips_waiting():
+    controller = ScrollController(step=1.0, wait=1.0)
+    assert controller.observe(0, 0, at_bottom=False)
+    assert controller.wait == controller.min_wait
+    assert controller.idle_rounds == 0
+
+
+def test_idle_at_bottom_waits_longer_then_stops():
+    controller = ScrollController(wait=0.5, idle_limit=3)
+    waits = []
+    for _ in range(2):
+        assert controller.observe(0, 5, at_bottom=True)
+        waits.append(controller.wait)
+    assert waits[0] >= controller.idle_wait
+    assert waits[1] > waits[0]
+    assert not controller.observe(0, 5, at_bottom=True)
+    assert controller.stop_reason == "바닥에서 새 카드 없음 (3회)"
+
+
+def test_new_cards_reset_idle_rounds():
+    controller = ScrollController(idle_limit=2)
+    controller.observe(0, 5, at_bottom=True)
+    controller.observe(3, 8, at_bottom=True)
+    assert controller.idle_rounds == 0
+    assert controller.observe(0, 8, at_bottom=True)
+
+
+def test_stop_conditions():
+    controller = ScrollController(product_budget=10)
+    assert not controller.observe(10, 10)
+    assert controller.stop_reason == "상품 수 한도 도달 (10/10)"
+
+    controller = ScrollController()
+    assert controller.observe(5, 5, end_of_feed=True)
+    assert not controller.observe(0, 5, end_of_feed=True)
+    assert controller.stop_reason == "피드 끝 표시 감지"
+
+    controller = ScrollController(max_rounds=2)
+    assert controller.observe(1, 1)
+    assert not controller.observe(1, 2)
+    assert controller.stop_reason == "최대 스크롤 횟수 도달 (2회)"
+
+    controller = ScrollController(time_budget=1)
+    controller.started -= 5
+    assert not controller.observe(1, 1)
+    assert controller.stop_reason == "시간 한도 도달 (1s)"
+
+
+def test_fruitless_more_clicks_disable_clicking():
+    controller = ScrollController(more_grace=2, max_fruitless_clicks=2)
+    assert controller.more_options() == {'allowMore': True, 'clearMore': False}
+    for _ in range(2):
+        controller.observe(0, 5, clicked_more=True)
+        # 결과를 기다리는 동안은 다시 누르지 않음
+        assert not controller.more_options()['allowMore']
+        controller.observe(0, 5)
+    assert controller.fruitless_clicks == 2
+    assert not controller.more_options()['allowMore']
+
+
+def test_successful_more_click_clears_marks_once():
+    controller = ScrollController()
+    controller.observe(0, 5, clicked_more=True)
+    controller.observe(4, 9)
+    assert controller.more_options() == {'allowMore': True, 'clearMore': True}
+    assert controller.more_options() == {'allowMore': True, 'clearMore': False}
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('SCROLL_TIME_BUDGET', '30')
+    monkeypatch.setenv('SCROLL_PRODUCT_BUDGET', 'abc')
+    monkeypatch.setenv('SCROLL_MAX_ROUNDS', '50')
+    controller = ScrollController.from_env(step=2.0)
+    assert controller.time_budget == 30
+    assert controller.product_budget == 0
+    assert controller.max_rounds == 50
+    assert controller.step == 2.0
+    # 호출 측 지정값이 환경변수보다 우선
+    assert ScrollController.from_env(max_rounds=20).max_rounds == 20
+
+
+def test_feed_scroll_args():
+    controller = ScrollController(step=1.5)
+    naver = feed_scroll_args('naver', '.card', controller)
+    assert naver['card'] == '.card'
+    assert naver['moreScope'] is None
+    assert naver['step'] == 1.5
+    assert naver['allowMore'] is True
+    # 쿠팡 더보기는 검색 결과 영역 안에서만 찾는다
+    coupang = feed_scroll_args('coupang', 'li.search-product', controller)
+    assert coupang['moreScope'] and '#productList' in coupang['moreScope']
+
+
+def test_selenium_call_wraps_the_same_script():
+    assert FEED_SCROLL_CALL_JS.startswith('return (')
+    assert FEED_SCROLL_JS.strip() in FEED_SCROLL_CALL_JS
+    assert FEED_SCROLL_CALL_JS.endswith(')(arguments[0]);')
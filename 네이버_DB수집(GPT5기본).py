@@ -9,52 +9,251 @@ import re
 import shutil
 import socket
 import subprocess
+import signal
+import argparse
+import hashlib
+import pickle
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from urllib.parse import quote, quote_plus, urlparse, parse_qs
+from html import escape
 import webbrowser
 import openpyxl
 from openpyxl.styles import PatternFill
 import tkinter as tk
 from tkinter import filedialog
 from time import perf_counter
+from functools import partial
+from crawl_common import (
+    FEED_SCROLL_JS, ColorResolver, ProgressChannel, ScrollController,
+    feed_scroll_args, get_keyword_groups, get_keyword_matcher, group_match_column,
+    must_match_groups, parse_color_rules, set_keyword_groups,
+    price_summary, result_dump_skip_reason, upsert_store_records,
+)
 
 def log_progress(msg: str):
     """간단 진행 로그 (시간표기/레벨 옵션 제거)"""
     print(msg)
 
-def extract_red_background_cells(excel_file_path):
-    """엑셀 파일에서 빨간색 배경을 가진 셀들의 값을 추출"""
+def extract_keyword_values_from_sheet(worksheet, resolver):
+    """시트에서 색상 규칙에 맞는 셀 값을 등장 순서대로 [(값, 그룹)] 추출 (시트 내 중복 제거)
+
+    행 단위로 순회하며 채우기 객체별 판정 결과를 재사용한다 (스타일 수만큼만 색 계산).
+    """
+    keyword_values = {}  # 순서 유지 집합 (값 -> 그룹)
+    fill_groups = {}
+    for row in worksheet.iter_rows():
+        for cell in row:
+            if cell.value is None:
+                continue
+            # 셀의 배경색 확인
+            fill = cell.fill
+            key = id(fill)
+            if key not in fill_groups:
+                fill_groups[key] = resolver.group_for_fill(fill)
+            group = fill_groups[key]
+            if group:
+                cell_value = str(cell.value).strip()
+                if cell_value and cell_value not in keyword_values:
+                    keyword_values[cell_value] = group
+    return list(keyword_values.items())
+
+def _scan_sheets(excel_file_path, sheet_names=None, rules=None):
+    """읽기 전용(스트리밍) 모드로 시트를 열어 색상 규칙에 맞는 값 추출"""
+    workbook = openpyxl.load_workbook(excel_file_path, read_only=True)
     try:
-        workbook = openpyxl.load_workbook(excel_file_path)
-        red_cell_values = []
-        
-        for sheet_name in workbook.sheetnames:
-            worksheet = workbook[sheet_name]
-            
-            for row in worksheet.iter_rows():
-                for cell in row:
-                    if cell.value is not None:
-                        # 셀의 배경색 확인
-                        fill = cell.fill
-                        if fill.fill_type == 'solid':
-                            # RGB 값으로 빨간색 계열인지 확인
-                            if fill.start_color.rgb:
-                                color = fill.start_color.rgb
-                                if isinstance(color, str) and len(color) == 8:
-                                    # ARGB 형식에서 RGB 추출
-                                    r = int(color[2:4], 16)
-                                    g = int(color[4:6], 16)
-                                    b = int(color[6:8], 16)
-                                    
-                                    # 빨간색 계열 판단 (빨간색이 가장 강한 색상)
-                                    if r > g and r > b and r > 150:
-                                        cell_value = str(cell.value).strip()
-                                        if cell_value and cell_value not in red_cell_values:
-                                            red_cell_values.append(cell_value)
-        
+        resolver = ColorResolver.for_workbook(workbook, rules or parse_color_rules())
+        return {
+            name: extract_keyword_values_from_sheet(workbook[name], resolver)
+            for name in workbook.sheetnames
+            if sheet_names is None or name in sheet_names
+        }
+    finally:
         workbook.close()
-        print(f"엑셀 파일에서 {len(red_cell_values)}개의 빨간색 배경 키워드를 추출했습니다.")
+
+def get_excel_scan_workers():
+    """시트 병렬 스캔 프로세스 수 (EXCEL_SCAN_WORKERS, 기본 1 = 순차)"""
+    try:
+        return max(1, int(os.getenv('EXCEL_SCAN_WORKERS', '1')))
+    except ValueError:
+        return 1
+
+def read_keyword_values_by_sheet(excel_file_path, sheet_names=None, rules=None):
+    """시트별 키워드 {시트명: [(값, 그룹)...]} (sheet_names 지정 시 해당 시트만)"""
+    rules = rules or parse_color_rules()
+    workers = get_excel_scan_workers()
+    if workers > 1:
+        signatures = xlsx_sheet_signatures(excel_file_path)
+        names = [n for n in (signatures[1] if signatures else []) if sheet_names is None or n in sheet_names]
+        if len(names) > 1:
+            workers = min(workers, len(names))
+            groups = [names[i::workers] for i in range(workers)]
+            merged = {}
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for part in pool.map(_scan_sheets, [excel_file_path] * workers, groups, [rules] * workers):
+                    merged.update(part)
+            # 통합 문서의 시트 순서 유지
+            return {name: merged[name] for name in names if name in merged}
+    return _scan_sheets(excel_file_path, sheet_names, rules)
+
+def merge_sheet_keywords(sheets, order):
+    """시트 순서대로 키워드 병합 -> (키워드 목록, {키워드: 그룹}) (먼저 나온 그룹 우선)"""
+    groups = {}
+    for name in order:
+        for value, group in sheets.get(name, ()):
+            groups.setdefault(value, group)
+    return list(groups), groups
+
+KEYWORD_CACHE_VERSION = 2
+# 모든 시트가 함께 쓰는 파트 - 바뀌면 전체 재읽기 (sharedStrings 는 텍스트 수정마다 바뀌므로 제외)
+XLSX_SHARED_PARTS = ('xl/styles.xml', 'xl/theme/theme1.xml')
+
+def get_keyword_cache_path(excel_file_path):
+    """키워드 캐시 파일 경로 (KEYWORD_CACHE_DIR 로 변경 가능, 기본: results/keyword_cache)
+
+    캐시 폴더를 세 스크립트가 같이 쓰므로 키에 스크립트 파일명을 넣어 스크립트별로 따로 둔다.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    cache_dir = os.getenv('KEYWORD_CACHE_DIR') or os.path.join(script_dir, "results", "keyword_cache")
+    key = f"{os.path.basename(__file__)}|{os.path.abspath(excel_file_path)}"
+    name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{name}.pkl")
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def xlsx_sheet_signatures(excel_file_path):
+    """xlsx 압축 항목 (CRC, 크기) 로 (공통 파트 서명, {시트명: 시트 서명}) 계산 - 실패 시 None
+
+    시트 XML 은 공유 문자열을 번호로만 참조하므로, 시트 파트가 그대로인데 엑셀이 기존 번호의 문자열만
+    제자리에서 바꾸는 경우(일반 저장에서는 드묾)는 감지하지 못한다 - 의심되면 KEYWORD_CACHE=off 로 실행.
+    """
+    try:
+        with zipfile.ZipFile(excel_file_path) as zf:
+            entries = {info.filename: (info.CRC, info.file_size) for info in zf.infolist()}
+            workbook_xml = ET.fromstring(zf.read('xl/workbook.xml'))
+            rels_xml = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    except Exception:
+        return None
+    
+    targets = {}
+    for rel in rels_xml:
+        target = rel.get('Target', '')
+        target = target.lstrip('/') if target.startswith('/') else 'xl/' + target
+        targets[rel.get('Id')] = target
+    
+    rid_attr = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id'
+    sheets = {}
+    for sheet in workbook_xml.iter():
+        if sheet.tag.endswith('}sheet'):
+            part = targets.get(sheet.get(rid_attr))
+            sheets[sheet.get('name')] = entries.get(part)
+    shared = tuple(entries.get(part) for part in XLSX_SHARED_PARTS)
+    return shared, sheets
+
+def load_keyword_cache(cache_path):
+    try:
+        with open(cache_path, 'rb') as f:
+            cache = pickle.load(f)
+        if cache.get('version') == KEYWORD_CACHE_VERSION:
+            return cache
+    except Exception:
+        pass
+    return None
+
+def save_keyword_cache(cache_path, cache):
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"키워드 캐시 저장 실패: {e}")
+
+def load_keywords_cached(excel_file_path):
+    """색상 규칙 키워드 추출 + 캐시 (mtime/크기 -> 내용 해시 -> 시트별 서명 순으로 재사용)
+
+    반환: (키워드 목록, {키워드: 그룹}, 캐시 상태 문자열). KEYWORD_CACHE=off 이면 캐시를 쓰지 않는다.
+    캐시에는 키워드/그룹 같은 순수 데이터만 저장하고 매처는 불러올 때 다시 만든다.
+    스타일/테마 파트가 바뀌거나 색상 규칙(KEYWORD_COLOR_RULES)이 바뀌면 캐시 전체를 다시 만든다.
+    """
+    rules = parse_color_rules()
+    if os.getenv('KEYWORD_CACHE', 'on').strip().lower() in ('off', '0', 'false', 'no'):
+        sheets = read_keyword_values_by_sheet(excel_file_path, rules=rules)
+        return merge_sheet_keywords(sheets, list(sheets)) + ('off',)
+    
+    cache_path = get_keyword_cache_path(excel_file_path)
+    cache = load_keyword_cache(cache_path)
+    if cache and cache.get('rules') != rules:
+        cache = None
+    stat = os.stat(excel_file_path)
+    
+    # 1) mtime/크기 동일 -> 즉시 사용
+    if cache and cache['mtime'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+        status = 'hit'
+    else:
+        sha256 = file_sha256(excel_file_path)
+        if cache and cache['sha256'] == sha256:
+            # 2) 내용 동일 (복사/저장만 다시 한 경우)
+            status = 'hit'
+        else:
+            # 3) 시트 서명이 바뀐 시트만 다시 읽기 (공통 파트가 바뀌면 전체)
+            signatures = xlsx_sheet_signatures(excel_file_path)
+            old_sheets = cache['sheets'] if cache and signatures and cache.get('shared') == signatures[0] else {}
+            if signatures:
+                shared, sheet_sigs = signatures
+                stale = [name for name, sig in sheet_sigs.items()
+                         if name not in old_sheets or old_sheets[name]['sig'] != sig or sig is None]
+            else:
+                shared, sheet_sigs, stale = None, None, None
+            
+            fresh = read_keyword_values_by_sheet(excel_file_path, stale, rules) if stale is None or stale else {}
+            order = list(sheet_sigs) if sheet_sigs is not None else list(fresh)
+            sheets = {
+                name: fresh[name] if name in fresh else old_sheets[name]['values']
+                for name in order
+                if name in fresh or name in old_sheets
+            }
+            keywords, groups = merge_sheet_keywords(sheets, order)
+            cache = {
+                'version': KEYWORD_CACHE_VERSION,
+                'rules': rules,
+                'sha256': sha256,
+                'shared': shared,
+                'sheets': {name: {'sig': (sheet_sigs or {}).get(name), 'values': vals} for name, vals in sheets.items()},
+                'keywords': keywords,
+                'groups': groups,
+            }
+            status = 'miss' if stale is None or len(stale) == len(order) else f'partial ({len(stale)}/{len(order)} 시트)'
+        cache['mtime'] = stat.st_mtime_ns
+        cache['size'] = stat.st_size
+        save_keyword_cache(cache_path, cache)
+    
+    keywords, groups = cache['keywords'], cache['groups']
+    # 매처를 미리 구축해 매칭 단계에서 재사용하도록 등록
+    get_keyword_matcher(keywords, groups)
+    return keywords, groups, status
+
+def extract_red_background_cells(excel_file_path):
+    """엑셀 파일에서 색상 규칙(기본: 빨간색 배경 = must)에 맞는 셀들의 값을 추출 (디스크 캐시 사용)
+
+    키워드별 그룹은 set_keyword_groups 로 등록되어 매칭 시 함께 사용된다.
+    """
+    try:
+        red_cell_values, keyword_groups, cache_status = load_keywords_cached(excel_file_path)
+        set_keyword_groups(keyword_groups)
+        print(f"엑셀 파일에서 {len(red_cell_values)}개의 키워드를 추출했습니다. (캐시: {cache_status})")
+        multi_group = len(set(keyword_groups.values())) > 1
         for i, keyword in enumerate(red_cell_values, 1):
-            print(f"{i}. {keyword}")
+            group_label = f" [{keyword_groups[keyword]}]" if multi_group else ""
+            print(f"{i}. {keyword}{group_label}")
         
         return red_cell_values
         
@@ -86,117 +285,533 @@ def select_excel_file():
         return None
 
 def highlight_keywords_in_text(text, keywords):
-    """텍스트에서 키워드와 부분 일치하는 부분을 하이라이트 (중복 하이라이트 방지)"""
+    """텍스트에서 키워드와 부분 일치하는 부분을 하이라이트 (중복 하이라이트 방지)
+
+    긴 키워드 우선으로 겹치지 않는 구간을 한 번에 계산한 뒤 결과 문자열을 한 번에 조립한다.
+    """
     if not text or not keywords:
         return text
     
-    # 키워드 길이 순으로 정렬 (긴 키워드부터 처리)
-    sorted_keywords = sorted(keywords, key=len, reverse=True)
-    
-    # 각 키워드에 대해 순차적으로 하이라이트 적용
-    result_text = text
-    
-    for keyword in sorted_keywords:
-        if keyword.strip():
-            # 이미 하이라이트된 부분을 임시로 보호
-            highlight_pattern = r'<span class="highlight">[^<]*</span>'
-            protected_parts = []
-            temp_text = result_text
-            
-            # 기존 하이라이트 부분을 임시 플레이스홀더로 대체
-            import re
-            matches = list(re.finditer(highlight_pattern, temp_text))
-            for i, match in enumerate(reversed(matches)):
-                placeholder = f"__PROTECTED_{i}__"
-                protected_parts.insert(0, match.group())
-                temp_text = temp_text[:match.start()] + placeholder + temp_text[match.end():]
-            
-            # 보호된 텍스트에서 키워드 하이라이트 적용 (단어 경계 고려하지 않음 - 부분 일치)
-            pattern = re.escape(keyword.strip())
-            temp_text = re.sub(
-                f'({pattern})', 
-                r'<span class="highlight">\1</span>', 
-                temp_text, 
-                flags=re.IGNORECASE
-            )
-            
-            # 보호된 부분들을 다시 복원
-            for i, protected in enumerate(protected_parts):
-                temp_text = temp_text.replace(f"__PROTECTED_{i}__", protected)
-            
-            result_text = temp_text
+    spans = get_keyword_matcher(keywords).highlight_spans(text)
+    if not spans:
+        return text
     
-    return result_text
+    parts = []
+    pos = 0
+    for start, end in spans:
+        parts.append(text[pos:start])
+        parts.append('<span class="highlight">')
+        parts.append(text[start:end])
+        parts.append('</span>')
+        pos = end
+    parts.append(text[pos:])
+    return ''.join(parts)
 
 async def scroll_and_collect(page):
-    """스크롤하면서 실시간 데이터 수집 - 무제한 버전"""
-    log_progress("스크롤 및 데이터 수집 시작... (무제한 모드)")
+    """스크롤하면서 실시간 데이터 수집 - 카드 도착 속도에 맞춰 스크롤 폭/대기 조정, 피드 끝에서 바로 종료"""
+    log_progress("스크롤 및 데이터 수집 시작... (적응형 스크롤)")
     
     collected_products = {}  # 중복 제거를 위한 딕셔너리 (key: 상품명+판매처)
-    last_height = 0
-    no_change_count = 0
-    scroll_count = 0
-    no_new_products_count = 0
-    last_product_count = 0
+    controller = ScrollController.from_env()
+    feed = {'atBottom': False, 'end': False, 'more': False}
+    
+    # 이전 세션의 카드 표시를 지우고 이후 패스는 새로 추가된 카드만 직렬화
+    try:
+        await page.evaluate(CARD_SEEN_RESET_JS)
+    except Exception:
+        pass
     
     while True:
-        # 현재 보이는 상품들 수집
-        await collect_visible_products(page, collected_products)
-        
-        # 스크롤 전 높이
-        current_height = await page.evaluate("document.body.scrollHeight")
-        
-        # 스크롤 다운
-        await page.evaluate("window.scrollBy(0, window.innerHeight * 0.8)")  # 80% 정도만 스크롤
-        await page.wait_for_timeout(1500)  # 렌더링 대기
-        
-        # 스크롤 후 높이
-        new_height = await page.evaluate("document.body.scrollHeight")
-        
-        # 새로운 상품이 추가되었는지 확인
-        current_product_count = len(collected_products)
-        if current_product_count == last_product_count:
-            no_new_products_count += 1
-        else:
-            no_new_products_count = 0
-        last_product_count = current_product_count
+        # 현재 보이는 상품들 중 새로 추가된 카드만 수집
+        before = len(collected_products)
+        await collect_visible_products(page, collected_products, only_new=True)
+        added = len(collected_products) - before
+        if not controller.observe(added, len(collected_products), feed['atBottom'], feed['end'], feed['more']):
+            log_progress(f"스크롤 종료: {controller.stop_reason}")
+            break
         
-        # 변화 체크 (페이지 끝 감지를 위해 유지하되, 임계값 증가)
-        if new_height == last_height:
-            no_change_count += 1
-            # 10번 연속 변화가 없고, 새 상품도 없으면 종료
-            if no_change_count >= 10 and no_new_products_count >= 10:
-                # 마지막까지 스크롤 후 한번 더 수집
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await page.wait_for_timeout(2000)
-                await collect_visible_products(page, collected_products)
-                log_progress("페이지 끝에 도달했습니다.")
-                break
-        else:
-            no_change_count = 0
+        feed = await page.evaluate(FEED_SCROLL_JS, feed_scroll_args('naver', CARD_SELECTORS['card'], controller))
+        await page.wait_for_timeout(int(controller.wait * 1000))
+    
+    log_progress(f"스크롤 완료 ({controller.rounds}번) - 총 {len(collected_products)}개 상품 수집")
+    return list(collected_products.values())
+
+# 상품 카드 셀렉터 (일괄 추출 스크립트에 전달)
+CARD_SELECTORS = {
+    'card': 'li.compositeCardContainer_composite_card_container__jr8cb.composite_card_container',
+    'title': 'strong.productCardTitle_product_card_title__eQupA',
+    'mall': 'span.productCardMallLink_mall_name__5oWPw',
+    'price': 'span.priceTag_number__1QW0R',
+    'badge': 'span.productCardDeliveryBadge_text__OrtL_',
+    'fee': 'span.productCardDeliveryFeeInfo_delivery_text__54pei',
+    'image': 'img.autoFitImg_auto_fit_img__fIpj4, img.productCardThumbnail_image__Li6iz, img[class*="thumbnail"], img[class*="product"]',
+    'link': 'a.productCardLink_link__bCGy9',
+}
+
+# 카드 일괄 추출 스크립트: 필드마다 CDP 왕복하지 않고 page.evaluate 1회로 모든 카드를 직렬화
+# 카드당 [상품명, 판매처, 가격, 배송배지, 배송비, [img src, data-src, srcset, 배경 style, 링크 img src]]
+# sel.onlyNew 이면 이전 패스에서 직렬화한 카드(data-pc-seen 표시)는 건너뛰어 새로 추가된 카드만 반환
+CARD_EXTRACT_JS = """
+(sel) => {
+    const text = (root, s) => {
+        const el = root.querySelector(s);
+        return el ? (el.textContent || '').trim() : '';
+    };
+    const rows = [];
+    const cardSelector = sel.onlyNew ? sel.card + ':not([data-pc-seen])' : sel.card;
+    document.querySelectorAll(cardSelector).forEach(card => {
+        const titleEl = card.querySelector(sel.title);
+        if (!titleEl) return;
+        card.setAttribute('data-pc-seen', '1');
+        const img = card.querySelector(sel.image);
+        const bg = card.querySelector('div[style*="background-image"]');
+        const link = card.querySelector(sel.link);
+        const linkImg = link ? link.querySelector('img') : null;
+        rows.push([
+            (titleEl.textContent || '').trim(),
+            text(card, sel.mall),
+            text(card, sel.price),
+            text(card, sel.badge),
+            text(card, sel.fee),
+            [
+                img ? (img.getAttribute('src') || '') : '',
+                img ? (img.getAttribute('data-src') || '') : '',
+                img ? (img.getAttribute('srcset') || '') : '',
+                bg ? (bg.getAttribute('style') || '') : '',
+                linkImg ? (linkImg.getAttribute('src') || '') : '',
+            ],
+        ]);
+    });
+    return rows;
+}
+"""
+
+# 새 수집 세션 시작 시 이전 패스의 카드 표시 제거
+CARD_SEEN_RESET_JS = """
+() => {
+    document.querySelectorAll('[data-pc-seen]').forEach(el => el.removeAttribute('data-pc-seen'));
+}
+"""
+
+# 스트리밍 수집: 새 카드가 DOM에 붙으면 MutationObserver가 일괄 추출 후 바인딩(__pcPushCards)으로 즉시 전달
+CARD_STREAM_INSTALL_JS = """
+(sel) => {
+    if (window.__pcStreamObserver) window.__pcStreamObserver.disconnect();
+    const extract = """ + CARD_EXTRACT_JS.strip() + """;
+    const opts = Object.assign({}, sel, { onlyNew: true });
+    let scheduled = false;
+    const flush = () => {
+        scheduled = false;
+        const rows = extract(opts);
+        if (rows.length && window.__pcPushCards) window.__pcPushCards(rows);
+    };
+    const observer = new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(flush, 50);
+    });
+    observer.observe(document.body, { childList: true, subtree: true });
+    window.__pcStreamObserver = observer;
+    flush();
+    return true;
+}
+"""
+
+CARD_STREAM_STOP_JS = """
+() => {
+    if (window.__pcStreamObserver) window.__pcStreamObserver.disconnect();
+    window.__pcStreamObserver = null;
+}
+"""
+
+# 한 번 스크롤 후 바닥 도달 여부 반환
+SCROLL_STEP_JS = """
+() => {
+    window.scrollBy(0, window.innerHeight * 0.8);
+    return window.innerHeight + window.scrollY >= document.body.scrollHeight - 2;
+}
+"""
+
+STREAM_IDLE_TIMEOUT = 2.0  # 바닥에서 새 카드 도착을 기다리는 최대 시간(초)
+STREAM_MAX_IDLE_ROUNDS = 3  # 바닥에서 연속으로 새 카드가 없으면 종료
+
+# 페이지별 스트리밍 수신 콜백 (바인딩은 페이지당 1회만 등록 가능하므로 수신처만 교체)
+_stream_sinks = {}
+
+def _dispatch_stream_rows(source, rows):
+    sink = _stream_sinks.get(source.get('page'))
+    if sink:
+        sink(rows)
+
+async def stream_and_collect(page):
+    """MutationObserver 스트리밍 수집 - 고정 대기 없이 새 카드 도착 시점에 맞춰 스크롤"""
+    log_progress("스트리밍 수집 시작... (MutationObserver)")
+    
+    collected_products = {}
+    arrived = asyncio.Event()
+    
+    def on_rows(rows):
+        if add_card_rows(collected_products, rows):
+            arrived.set()
+    
+    try:
+        await page.expose_binding('__pcPushCards', _dispatch_stream_rows)
+    except Exception:
+        pass  # 같은 페이지에 이미 등록됨
+    _stream_sinks[page] = on_rows
+    
+    scroll_count = 0
+    idle_rounds = 0
+    try:
+        await page.evaluate(CARD_SEEN_RESET_JS)
+        await page.evaluate(CARD_STREAM_INSTALL_JS, CARD_SELECTORS)
         
-        last_height = new_height
-        scroll_count += 1
+        while True:
+            arrived.clear()
+            at_bottom = await page.evaluate(SCROLL_STEP_JS)
+            scroll_count += 1
+            
+            if not at_bottom:
+                # 이미 렌더링된 영역: 도착 이벤트를 잠깐만 기다리고 계속 스크롤
+                try:
+                    await asyncio.wait_for(arrived.wait(), timeout=0.2)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            # 바닥: 다음 묶음이 렌더링될 때까지 대기 (도착하는 즉시 다음 스크롤)
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout=STREAM_IDLE_TIMEOUT)
+                idle_rounds = 0
+            except asyncio.TimeoutError:
+                idle_rounds += 1
+                if idle_rounds >= STREAM_MAX_IDLE_ROUNDS:
+                    log_progress("페이지 끝에 도달했습니다.")
+                    break
         
-        # 현재까지 수집된 상품 수 출력
-        if scroll_count % 5 == 0:
-            # 상세 진행 로그는 제거(요약만 유지)
+        await page.evaluate(CARD_STREAM_STOP_JS)
+        await collect_visible_products(page, collected_products, only_new=True)
+    except Exception as e:
+        print(f"스트리밍 수집 중 오류: {e}")
+    finally:
+        _stream_sinks.pop(page, None)
+    
+    log_progress(f"스트리밍 완료 ({scroll_count}번 스크롤) - 총 {len(collected_products)}개 상품 수집")
+    return list(collected_products.values())
+
+# 상품 목록 API 응답 URL 패턴 (NETWORK_CAPTURE_PATTERNS=패턴1,패턴2 로 교체 가능)
+NETWORK_CAPTURE_PATTERNS = ('paged-composite-cards', '/ns/v1/search', '/api/search/')
+
+# JSON 상품 레코드 키 후보
+JSON_TITLE_KEYS = ('productName', 'productTitle', 'title', 'name')
+JSON_PRICE_KEYS = ('discountedSalePrice', 'salePrice', 'lowPrice', 'mobileLowPrice', 'price')
+JSON_MALL_KEYS = ('mallName', 'mallNm', 'storeName', 'channelName', 'mall')
+JSON_IMAGE_KEYS = ('imageUrl', 'productImageUrl', 'imgUrl', 'image', 'thumbnail')
+JSON_DELIVERY_KEYS = ('deliveryFee', 'deliveryPrice', 'dlvryPrice', 'deliveryFeeAmount')
+JSON_FREE_DELIVERY_KEYS = ('isFreeDelivery', 'freeDelivery')
+
+def network_capture_patterns():
+    override = os.getenv('NETWORK_CAPTURE_PATTERNS', '')
+    patterns = tuple(p.strip() for p in override.split(',') if p.strip())
+    return patterns or NETWORK_CAPTURE_PATTERNS
+
+def _json_first(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if isinstance(value, dict):
+            value = value.get('name') or value.get('url') or value.get('value')
+        if value not in (None, '', [], {}):
+            return value
+    return None
+
+def json_record_to_product(record):
+    """상품 목록 API의 JSON 레코드를 상품 dict로 변환 (상품 레코드가 아니면 None)"""
+    title = _json_first(record, JSON_TITLE_KEYS)
+    price = _json_first(record, JSON_PRICE_KEYS)
+    if not isinstance(title, str) or price is None or isinstance(price, (dict, list, bool)):
+        return None
+    
+    thumbnail = _json_first(record, JSON_IMAGE_KEYS)
+    thumbnail = thumbnail if isinstance(thumbnail, str) else ""
+    if thumbnail.startswith('//'):
+        thumbnail = 'https:' + thumbnail
+    if not thumbnail.startswith('http'):
+        thumbnail = ""
+    
+    if any(record.get(key) is True for key in JSON_FREE_DELIVERY_KEYS):
+        delivery = "0"
+    else:
+        fee = _json_first(record, JSON_DELIVERY_KEYS)
+        delivery = extract_price_number(str(fee)) if isinstance(fee, (int, float, str)) and not isinstance(fee, bool) else ""
+    
+    mall = _json_first(record, JSON_MALL_KEYS)
+    return {
+        '상품명': re.sub(r'<[^>]+>', '', title).strip(),
+        '판매처': mall.strip() if isinstance(mall, str) else "",
+        '썸네일': thumbnail,
+        '가격': extract_price_number(str(price)),
+        '배송비': delivery,
+    }
+
+def iter_json_products(data):
+    """JSON 트리를 순회하며 상품 레코드로 보이는 dict를 상품 dict로 변환해 반환"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            product = json_record_to_product(node)
+            if product and product['상품명']:
+                yield product
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+class NetworkProductCapture:
+    """page.on("response")로 상품 목록 API 응답을 가로채 JSON에서 상품 레코드를 직접 수집"""
+
+    def __init__(self, page, patterns=None):
+        self.page = page
+        self.patterns = tuple(patterns or network_capture_patterns())
+        self.products = {}
+        self.responses = 0  # 상품 레코드가 실제로 들어 있던 응답 수 (빈 응답은 세지 않음)
+        self.arrived = asyncio.Event()
+        self._tasks = set()
+
+    def matches(self, response):
+        return any(p in response.url for p in self.patterns)
+
+    def attach(self):
+        self.page.on("response", self._on_response)
+        return self
+
+    def detach(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
             pass
+
+    def _on_response(self, response):
+        if not self.matches(response):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, response):
+        try:
+            if 'json' not in (response.headers.get('content-type') or ''):
+                return
+            data = await response.json()
+        except Exception:
+            return
+        records = 0
+        added = 0
+        for product in iter_json_products(data):
+            records += 1
+            unique_key = f"{product['상품명']}_{product['판매처']}"
+            if unique_key not in self.products:
+                self.products[unique_key] = product
+                added += 1
+        if records:
+            self.responses += 1
+        if added:
+            self.arrived.set()
+
+    async def drain(self):
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+# 수집 중 요청 차단 정책 (RESOURCE_POLICY=balanced|urls-only|full)
+#   balanced(기본): 폰트/미디어/추적·광고 차단, 이미지는 유지 | urls-only: balanced + 이미지 (썸네일은 URL 속성만 읽음) | full: 차단 없음
+#   유형은 Playwright request.resource_type 기준이라 확장자 없는 CDN 이미지/폰트 URL 도 분류된다
+#   route 를 걸면 Playwright 가 브라우저 HTTP 캐시를 끄므로 캐시 효과를 비교할 때는 full 로 측정
+RESOURCE_POLICIES = {
+    'full': frozenset(),
+    'balanced': frozenset({'font', 'media', 'tracker'}),
+    'urls-only': frozenset({'image', 'font', 'media', 'tracker'}),
+}
+DEFAULT_RESOURCE_POLICY = 'balanced'
+# 추적/광고 요청 호스트 (RESOURCE_BLOCK_HOSTS=호스트1,호스트2 로 추가 가능)
+TRACKER_HOST_PATTERNS = (
+    'nlog.naver.com', 'lcs.naver.com', 'wcs.naver.', 'siape.veta.naver.com', 'tivan.naver.com',
+    'google-analytics.com', 'googletagmanager.com', 'doubleclick.net', 'facebook.net',
+)
+
+def get_resource_policy():
+    name = (os.getenv('RESOURCE_POLICY', DEFAULT_RESOURCE_POLICY) or DEFAULT_RESOURCE_POLICY).strip().lower()
+    if name not in RESOURCE_POLICIES:
+        print(f"알 수 없는 RESOURCE_POLICY({name}) - {DEFAULT_RESOURCE_POLICY} 사용")
+        return DEFAULT_RESOURCE_POLICY
+    return name
+
+def tracker_host_patterns():
+    extra = tuple(p.strip() for p in os.getenv('RESOURCE_BLOCK_HOSTS', '').split(',') if p.strip())
+    return TRACKER_HOST_PATTERNS + extra
+
+def classify_blocked_request(resource_type, url, blocked_types, tracker_hosts):
+    """차단할 요청이면 차단 유형(image/font/media/tracker), 아니면 None"""
+    if resource_type in blocked_types:
+        return resource_type
+    if 'tracker' in blocked_types:
+        host = (urlparse(url).hostname or '').lower()
+        if any(pattern in host for pattern in tracker_hosts):
+            return 'tracker'
+    return None
+
+class ResourceBlocker:
+    """request.resource_type 과 추적 호스트로 요청을 분류해 차단하고 유형별 차단 건수를 집계
+
+    차단 유형이 없는 정책(full)은 route 를 걸지 않아 요청이 Python 을 거치지 않는다.
+    """
+
+    def __init__(self, page, policy=None):
+        self.page = page
+        self.policy = policy or get_resource_policy()
+        self.blocked_types = RESOURCE_POLICIES[self.policy]
+        self.tracker_hosts = tuple(h.lower() for h in tracker_host_patterns())
+        self.blocked = {}
+        self.attached = False
+        self._handler = self._handle
+
+    async def _handle(self, route, request):
+        kind = classify_blocked_request(request.resource_type, request.url, self.blocked_types, self.tracker_hosts)
+        if kind is None:
+            await route.continue_()
+            return
+        self.blocked[kind] = self.blocked.get(kind, 0) + 1
+        await route.abort('blockedbyclient')
+
+    async def attach(self):
+        if self.blocked_types and not self.attached:
+            await self.page.route('**/*', self._handler)
+            self.attached = True
+        return self
+
+    async def detach(self):
+        if self.attached:
+            try:
+                await self.page.unroute('**/*', self._handler)
+            except Exception:
+                pass
+            self.attached = False
+
+    def summary(self):
+        detail = ' · '.join(f"{kind} {count}" for kind, count in sorted(self.blocked.items(), key=lambda kv: -kv[1]))
+        return f"요청 차단({self.policy}): {sum(self.blocked.values())}건{f' [{detail}]' if detail else ''}"
+
+async def network_and_collect(page, capture=None):
+    """상품 목록 API 응답(JSON)으로 수집 - DOM 수집은 리스너 이전 카드와 응답 미검출 시 폴백"""
+    log_progress("네트워크 응답 수집 시작... (상품 목록 API)")
+    
+    own_capture = capture is None
+    if own_capture:
+        capture = NetworkProductCapture(page).attach()
+    
+    collected_products = {}
+    controller = ScrollController.from_env()
+    feed = {'atBottom': False, 'end': False, 'more': False}
+    seen = 0
+    try:
+        # 리스너 등록 전에 이미 렌더링된 카드는 DOM에서 수집
+        await page.evaluate(CARD_SEEN_RESET_JS)
+        await collect_visible_products(page, collected_products, only_new=True)
         
-        # 100회마다 진행 상황 상세 출력
-        if scroll_count % 100 == 0:
-            # 상세 진행 로그는 제거(요약만 유지)
-            pass
+        while True:
+            total = len(collected_products.keys() | capture.products.keys())
+            if not controller.observe(total - seen, total, feed['atBottom'], feed['end'], feed['more']):
+                log_progress(f"스크롤 종료: {controller.stop_reason}")
+                break
+            seen = total
+            
+            capture.arrived.clear()
+            feed = await page.evaluate(FEED_SCROLL_JS, feed_scroll_args('naver', CARD_SELECTORS['card'], controller))
+            # 새 상품 응답이 오면 바로 진행, 없으면 scroll_and_collect 와 같은 대기/백오프만큼 기다림
+            try:
+                await asyncio.wait_for(capture.arrived.wait(), timeout=controller.wait)
+            except asyncio.TimeoutError:
+                pass
+            # 상품이 든 응답이 아직 없거나 바닥에서 응답이 오지 않으면 DOM 폴백
+            if not capture.responses or (feed['atBottom'] and not capture.arrived.is_set()):
+                await collect_visible_products(page, collected_products, only_new=True)
         
-        # 스크롤 횟수 제한 제거 (무제한)
-        # if scroll_count >= 100:  # 이 제한을 제거
-        #     break
+        await capture.drain()
+    except Exception as e:
+        print(f"네트워크 응답 수집 중 오류: {e}")
+    finally:
+        if own_capture:
+            capture.detach()
     
-    log_progress(f"스크롤 완료 ({scroll_count}번) - 총 {len(collected_products)}개 상품 수집")
+    # API 레코드가 정확한 가격/이미지를 가지므로 같은 상품은 API 값으로 덮어씀
+    collected_products.update(capture.products)
+    if not capture.responses:
+        print("상품 목록 API 응답을 찾지 못해 DOM 수집 결과를 사용합니다. (NETWORK_CAPTURE_PATTERNS 확인)")
+    log_progress(f"네트워크 수집 완료 ({controller.rounds}번 스크롤, 응답 {capture.responses}건) - 총 {len(collected_products)}개 상품 수집")
     return list(collected_products.values())
 
-async def collect_visible_products(page, collected_products):
-    """현재 보이는 상품들 수집"""
+async def collect_products(page, capture=None, blocker=None):
+    """COLLECT_MODE 에 따라 수집 방식 선택 (scroll: 고정 대기 스크롤 | stream: MutationObserver 스트리밍 | network: API 응답)
+
+    수집 동안 RESOURCE_POLICY 요청 차단을 적용한다 (blocker 를 넘기면 호출 측이 등록/해제).
+    """
+    mode = (os.getenv('COLLECT_MODE', 'scroll') or 'scroll').strip().lower()
+    own_blocker = blocker is None
+    if own_blocker:
+        blocker = await ResourceBlocker(page).attach()
+    try:
+        if mode == 'stream':
+            return await stream_and_collect(page)
+        if mode == 'network':
+            return await network_and_collect(page, capture)
+        return await scroll_and_collect(page)
+    finally:
+        if own_blocker:
+            await blocker.detach()
+        if blocker.blocked_types:
+            log_progress(f"{blocker.summary()}")
+
+async def collect_visible_products(page, collected_products, only_new=False):
+    """현재 보이는 상품들 수집 - page.evaluate 1회로 전체 카드 일괄 추출 (CARD_EXTRACT_MODE=element 시 요소 단위)
+
+    only_new=True 이면 페이지 안의 표시(data-pc-seen)로 이전 패스 이후 추가된 카드만 직렬화한다.
+    """
+    if os.getenv('CARD_EXTRACT_MODE', 'batch').strip().lower() == 'element':
+        return await collect_visible_products_by_element(page, collected_products)
+    
+    try:
+        rows = await page.evaluate(CARD_EXTRACT_JS, {**CARD_SELECTORS, 'onlyNew': bool(only_new)})
+    except Exception as e:
+        print(f"일괄 추출 실패, 요소 단위 수집으로 전환: {e}")
+        return await collect_visible_products_by_element(page, collected_products)
+    
+    add_card_rows(collected_products, rows)
+
+def add_card_rows(collected_products, rows):
+    """일괄 추출 스크립트가 반환한 카드 배열을 상품 dict로 변환해 추가하고 새로 추가된 개수를 반환"""
+    added = 0
+    for row in rows or []:
+        try:
+            title, mall, price_text, badge_text, fee_text, thumbnail_candidates = row
+            
+            # 유니크 키 생성 (이미 수집된 상품이면 스킵)
+            unique_key = f"{title}_{mall}"
+            if unique_key in collected_products:
+                continue
+            
+            collected_products[unique_key] = {
+                '상품명': title,
+                '판매처': mall,
+                '썸네일': pick_thumbnail_url(thumbnail_candidates),
+                '가격': extract_price_number(price_text),
+                '배송비': extract_delivery_fee(badge_text, fee_text),
+            }
+            added += 1
+        except Exception:
+            continue
+    return added
+
+async def collect_visible_products_by_element(page, collected_products):
+    """현재 보이는 상품들 수집 (요소 단위 조회 - 일괄 추출 실패 시 폴백)"""
     product_cards_selector = 'li.compositeCardContainer_composite_card_container__jr8cb.composite_card_container'
     
     try:
@@ -292,6 +907,25 @@ async def extract_thumbnail(card):
     
     return ""
 
+def pick_thumbnail_url(candidates):
+    """일괄 추출된 썸네일 후보에서 extract_thumbnail과 같은 우선순위로 URL 선택"""
+    src, data_src, srcset, bg_style, link_img_src = (list(candidates or []) + [''] * 5)[:5]
+    if src and src.startswith('http'):
+        return src
+    if data_src and data_src.startswith('http'):
+        return data_src
+    if srcset:
+        urls = re.findall(r'(https?://[^\s,]+)', srcset)
+        if urls:
+            return urls[0]
+    if bg_style:
+        bg_url = re.search(r'url\(["\']?(https?://[^"\']+)["\']?\)', bg_style)
+        if bg_url:
+            return bg_url.group(1)
+    if link_img_src and link_img_src.startswith('http'):
+        return link_img_src
+    return ""
+
 def extract_price_number(price_text):
     """가격에서 숫자 추출"""
     if not price_text:
@@ -312,78 +946,172 @@ def extract_delivery_fee(delivery_badge_text, delivery_fee_text):
     return ""
 
 def log_keyword_matching(products_data, highlight_keywords):
-    """키워드 매칭 작업 진행 로그를 상품 단위로 출력하고 매칭된 상품 수를 반환"""
+    """키워드 매칭 작업 진행 로그를 상품 단위로 출력하고 매칭된 상품 수를 반환
+
+    '매칭' 은 필수 그룹(must_match_groups) 키워드와 일치할 때만 True 이고,
+    그룹별 일치 여부는 '매칭_<그룹>' 컬럼에 따로 기록한다 (watch 등 관찰 그룹 구분).
+    """
     total = len(products_data)
     matched_products = 0
     if not highlight_keywords:
         print(f"키워드 매칭 완료: 총 {total}개 (키워드 없음)")
         return 0
-    lowered_keywords = [kw.strip().lower() for kw in highlight_keywords if kw and kw.strip()]
+    matcher = get_keyword_matcher(highlight_keywords)
+    must_groups = must_match_groups(matcher.groups)
+    group_counts = dict.fromkeys(matcher.groups, 0)
     for product in products_data:
         try:
-            name = str(product.get('상품명', '')).strip().lower()
-            mall = str(product.get('판매처', '')).strip().lower()
-            for kw in lowered_keywords:
-                if kw and (kw in name or kw in mall):
-                    matched_products += 1
-                    product['매칭'] = True
-                    # 원본 보존
-                    product['매칭키워드'] = [k for k in highlight_keywords if k and k.strip().lower() == kw]
-                    break
-            else:
-                product['매칭'] = False
-                product['매칭키워드'] = []
+            name = str(product.get('상품명', '')).strip()
+            mall = str(product.get('판매처', '')).strip()
+            pid, matched_groups = matcher.match_summary(name, mall)
+            is_must = any(group in must_groups for group in matched_groups)
+            if is_must:
+                matched_products += 1
+            product['매칭'] = is_must
+            # 원본 보존
+            product['매칭키워드'] = list(matcher.pattern_keywords[pid]) if pid is not None else []
+            product['매칭그룹'] = matched_groups
+            for group in matcher.groups:
+                hit = group in matched_groups
+                product[group_match_column(group)] = hit
+                group_counts[group] += hit
         except Exception:
             pass
-    print(f"키워드 매칭 완료: 총 {total}개 중 {matched_products}개 매칭")
+    group_summary = ''
+    if len(group_counts) > 1:
+        group_summary = ' (' + ', '.join(f"{group} {count}개" for group, count in group_counts.items()) + ')'
+    print(f"키워드 매칭 완료: 총 {total}개 중 {matched_products}개 매칭{group_summary}")
     return matched_products
 
-async def save_products_data(products_data, highlight_keywords=None, page=None):
-    """데이터 저장"""
-    if not products_data:
-        return None
-    
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    # 스크립트와 같은 폴더에 결과물 저장 (CSS는 인라인 처리)
+# ===== 로컬 수집 저장소 (SQLite) =====
+def get_store_path():
+    """로컬 저장소 경로 (CRAWL_STORE_PATH 로 변경 가능, 기본: results/crawl_store.sqlite3)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.getenv('CRAWL_STORE_PATH') or os.path.join(script_dir, "results", "crawl_store.sqlite3")
+
+def upsert_products_store(products_data, query=None, path=None):
+    """네이버 상품을 로컬 저장소에 upsert (키: 상품명+판매처) - 반환값은 upsert_store_records 와 같음"""
+    records = []
+    for product in products_data:
+        name = str(product.get('상품명', ''))
+        mall = str(product.get('판매처', ''))
+        records.append({
+            'product_key': f"naver:{name}_{mall}",
+            'source': 'naver',
+            'name': name,
+            'mall': mall,
+            'thumbnail': product.get('썸네일', ''),
+            'price': product.get('가격', ''),
+            'delivery': product.get('배송비', ''),
+            'query': query,
+        })
+    return upsert_store_records(records, path or get_store_path())
+
+def format_price(value):
+    return f"{value:,}원" if value is not None else "-"
+
+def print_price_report(changed_only=False, limit=50):
+    """가격 이력 요약 출력 (--price-report)"""
+    rows = price_summary(get_store_path(), changed_only=changed_only, limit=limit)
+    print(f"가격 이력 요약: {len(rows)}개 상품 ({get_store_path()})")
+    for row in rows:
+        delta = row['가격변동']
+        delta_text = "-" if delta is None else (f"{delta:+,}원" if delta else "변동없음")
+        print(
+            f"   ▸ {row['상품명']} ({row['판매처']}) | 최근 {format_price(row['최근가격'])} ({delta_text})"
+            f" | 첫 {format_price(row['첫가격'])} · 최저 {format_price(row['최저가'])} · 최고 {format_price(row['최고가'])}"
+            f" | 배송비 {format_price(row['배송비'])} | 관측 {row['관측횟수']}회"
+        )
+
+def get_results_dir():
+    """결과물 저장 폴더 (스크립트 폴더의 results, 없으면 생성)"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    # 결과물 저장 폴더 준비
     results_dir = os.path.join(script_dir, "results")
     try:
         os.makedirs(results_dir, exist_ok=True)
     except Exception:
         pass
+    return results_dir
+
+def write_products_csv(path, products_data):
+    # 키워드 매칭을 거친 상품이면 매칭(필수 그룹)과 그룹별 매칭 컬럼을 덧붙임
+    match_fields = list(dict.fromkeys(
+        key for product in products_data for key in product if key == '매칭' or key.startswith('매칭_')
+    ))
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ['썸네일', '판매처', '상품명', '가격', '배송비'] + match_fields
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        for product in products_data:
+            writer.writerow(product)
+
+def write_products_json(path, products_data):
+    with open(path, 'w', encoding='utf-8') as jsonfile:
+        json.dump(products_data, jsonfile, ensure_ascii=False, indent=2)
+
+def record_crawl_store(products_data, query=None):
+    """수집 결과를 로컬 저장소/가격 이력에 반영하고 반영 통계 반환 (메인 프로세스에서만 호출 - SQLite 단일 기록자, 실패 시 None)"""
+    # 로컬 저장소 upsert + 가격 이력 (변동 없는 상품은 최종 확인 시각과 가격 요약만 갱신)
+    try:
+        t0 = perf_counter()
+        stats, changes = upsert_products_store(products_data, query=query)
+        duplicate_text = f" · 이번 실행 중복 {stats['duplicate']}" if stats['duplicate'] else ""
+        log_progress(f"저장소 반영: 신규 {stats['new']} · 변동 {stats['changed']} · 변동없음 {stats['unchanged']}{duplicate_text} ({perf_counter()-t0:.2f}s)")
+        
+        # 직전 관측 대비 가격/배송비 변동 표시
+        if changes:
+            log_progress(f"직전 관측 대비 가격/배송비 변동 {len(changes)}건")
+            for change in changes[:10]:
+                print(f"   ▸ {change['상품명']} ({change['판매처']}): {format_price(change['이전가격'])} → {format_price(change['가격'])}")
+        return stats
+    except Exception as e:
+        print(f"저장소 저장 오류: {e}")
+        return None
+
+async def save_products_data(products_data, highlight_keywords=None, page=None, file_prefix="naver_shopping_products", query=None):
+    """데이터 저장 (file_prefix: 결과 파일명 접두어, query: 저장소에 기록할 검색어)
+
+    저장소(SQLite)에 먼저 반영하고, 결과 파일(CSV/JSON/HTML)은 RESULT_DUMPS 정책에 따라 작성한다 (생략 시 None).
+    """
+    if not products_data:
+        return None
+    
+    stats = record_crawl_store(products_data, query)
+    skip_reason = result_dump_skip_reason(stats)
+    if skip_reason:
+        log_progress(f"결과 파일 생략: {skip_reason}")
+        return None
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 스크립트와 같은 폴더의 results 에 결과물 저장
+    results_dir = get_results_dir()
     
     # 경로 설정: 모든 산출물을 스크립트 폴더에 저장
-    csv_basename = f"naver_shopping_products_{timestamp}.csv"
+    csv_basename = f"{file_prefix}_{timestamp}.csv"
     csv_filename = os.path.join(results_dir, csv_basename)
     try:
         t0 = perf_counter()
         log_progress("CSV 저장 시작")
-        with open(csv_filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['썸네일', '판매처', '상품명', '가격', '배송비']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-            writer.writeheader()
-            for product in products_data:
-                writer.writerow(product)
+        write_products_csv(csv_filename, products_data)
         log_progress(f"CSV 저장 완료 ({len(products_data)}행, {perf_counter()-t0:.2f}s)")
     except Exception as e:
         print(f"CSV 저장 오류: {e}")
     
     # JSON 저장
-    json_basename = f"naver_shopping_products_{timestamp}.json"
+    json_basename = f"{file_prefix}_{timestamp}.json"
     json_filename = os.path.join(results_dir, json_basename)
     try:
         t0 = perf_counter()
         log_progress("JSON 저장 시작")
-        with open(json_filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(products_data, jsonfile, ensure_ascii=False, indent=2)
+        write_products_json(json_filename, products_data)
         log_progress(f"JSON 저장 완료 ({perf_counter()-t0:.2f}s)")
     except Exception as e:
         print(f"JSON 저장 오류: {e}")
     
     # HTML 저장 (키워드 하이라이트 포함)
-    html_basename = f"naver_shopping_products_{timestamp}.html"
+    html_basename = f"{file_prefix}_{timestamp}.html"
     html_filename = os.path.join(results_dir, html_basename)
+    progress = None
     try:
         t0 = perf_counter()
         log_progress("HTML 생성 시작")
@@ -395,50 +1123,34 @@ async def save_products_data(products_data, highlight_keywords=None, page=None):
             except Exception:
                 pass
 
-        # 무거운 HTML 생성을 별도 스레드에서 수행하며, 스레드-안전 진행 콜백으로 실제 진행률 반영
-        progress_cb = None
+        # 무거운 HTML 생성을 별도 스레드에서 수행 - 진행률은 채널이 최신 값만 모아 일정 주기로 반영
         if page is not None:
-            try:
-                loop = asyncio.get_running_loop()
-                def progress_cb(pct, text=None):
-                    try:
-                        loop.call_soon_threadsafe(asyncio.create_task, update_progress_bar(page, int(pct), text))
-                    except Exception:
-                        pass
-            except Exception:
-                progress_cb = None
+            progress = ProgressChannel(partial(update_progress_bar, page))
+        progress_cb = progress.push if progress else None
+
+        css_link, js_link = None, None
+        if get_report_assets_mode() == 'external':
+            css_link, js_link = write_report_assets(results_dir)
 
         html_task = asyncio.create_task(
             asyncio.to_thread(
-                generate_html_report,
+                write_html_report,
+                html_filename,
                 products_data,
                 timestamp,
                 highlight_keywords,
                 progress_cb,
+                css_link,
                 None,
+                js_link,
             )
         )
 
-        # 콜백이 없는 경우에만 간단한 시뮬레이션으로 사용자 체감 향상
-        if page is not None and progress_cb is None:
-            pct = 5
-            try:
-                while not html_task.done():
-                    pct = min(99, pct + 1)
-                    await update_progress_bar(page, int(pct), f"HTML 구성 중... {int(pct)}%")
-                    await asyncio.sleep(0.15)
-            except Exception:
-                pass
-
-        html_content = await html_task
-
-        if page is not None:
-            try:
-                await update_progress_bar(page, 98, "HTML 파일 저장 중...")
-            except Exception:
-                pass
-        with open(html_filename, 'w', encoding='utf-8') as htmlfile:
-            htmlfile.write(html_content)
+        try:
+            await html_task
+        finally:
+            if progress:
+                await progress.close()
         log_progress(f"HTML 저장 완료 ({perf_counter()-t0:.2f}s)")
         # 로그는 results/상대경로 기준으로 안내
         print(f"파일 저장 완료: {os.path.join('results', csv_basename)}, {os.path.join('results', json_basename)}, {os.path.join('results', html_basename)}")
@@ -603,52 +1315,726 @@ def build_report_css():
         }
     """
 
-def generate_html_report(products_data, timestamp, highlight_keywords=None, progress_callback=None, css_filename=None):
-    """HTML 리포트 생성 - 모든 상품 표시 (선택 삭제 기능 및 키워드 하이라이트 포함)"""
-    total_products = len(products_data)
-    current_time = datetime.now().strftime("%Y년 %m월 %d일 %H:%M:%S")
-    # 진행 로그 주기 제거(요약만 유지)
-    if progress_callback:
-        try:
-            progress_callback(5, "HTML 헤더 구성 중...")
-        except Exception:
-            pass
-    
-    # 이미지 있는 상품 수 계산
-    products_with_image = sum(1 for p in products_data if p.get('썸네일'))
-    
-    # 키워드 매칭된 상품 수 계산
-    matched_products = 0
-    if highlight_keywords:
-        for product in products_data:
-            product_name = product.get('상품명', '')
-            mall_name = product.get('판매처', '')
-            for keyword in highlight_keywords:
-                if keyword.lower() in product_name.lower() or keyword.lower() in mall_name.lower():
-                    matched_products += 1
-                    break
-    
-    # 필터 컨트롤 HTML (백슬래시 이스케이프가 필요한 onclick을 f-string 밖에서 구성)
-    filter_controls = ""
-    if highlight_keywords:
-        filter_controls = (
-            '<div class="filter-controls">\n'
+REPORT_VIRTUAL_THRESHOLD = 2000
+REPORT_CSV_PREFIX = 'products_'
+
+def get_report_mode(total_products):
+    """리포트 모드 (REPORT_MODE=cards|virtual|auto, 기본 auto: 상품 수가 REPORT_VIRTUAL_THRESHOLD 이상이면 virtual)"""
+    mode = os.getenv('REPORT_MODE', 'auto').strip().lower()
+    if mode in ('cards', 'virtual'):
+        return mode
+    try:
+        threshold = int(os.getenv('REPORT_VIRTUAL_THRESHOLD', str(REPORT_VIRTUAL_THRESHOLD)))
+    except ValueError:
+        threshold = REPORT_VIRTUAL_THRESHOLD
+    return 'virtual' if total_products >= threshold else 'cards'
+
+# 정렬/필터 인덱스 스크립트 - 사전 계산된 상품 번호 배열로 보이는 목록(view)을 계산 (DOM 탐색 없음)
+REPORT_INDEX_JS = r"""(() => {
+    const indexEl = document.getElementById('report-index');
+    if (!indexEl) return;
+    const index = JSON.parse(indexEl.textContent || '{}');
+    const count = index.count || 0;
+    const prices = index.prices || [];
+    const priceAsc = index.orders.price_asc || [];
+    const matchedMask = new Uint8Array(count);
+    (index.filters.on || []).forEach((i) => { matchedMask[i] = 1; });
+    let sortMode = 'default';
+    let priceRange = [null, null];
+
+    // 가격 오름차순 배열(가격 있는 상품이 앞쪽 index.priced 개)에서 경계 위치 이진 탐색
+    function bound(value, inclusive) {
+        let lo = 0;
+        let hi = index.priced || 0;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            const p = prices[priceAsc[mid]];
+            if (p < value || (inclusive && p === value)) lo = mid + 1; else hi = mid;
+        }
+        return lo;
+    }
+
+    window.reportIndex = index;
+    window.isReportMatched = (i) => matchedMask[i] === 1;
+
+    window.computeReportView = function(alive) {
+        let inRange = null;
+        if (priceRange[0] !== null || priceRange[1] !== null) {
+            inRange = new Uint8Array(count);
+            const from = priceRange[0] === null ? 0 : bound(priceRange[0], false);
+            const to = priceRange[1] === null ? (index.priced || 0) : bound(priceRange[1], true);
+            for (let k = from; k < to; k++) inRange[priceAsc[k]] = 1;
+        }
+        const sorted = sortMode !== 'default' && index.orders[sortMode];
+        const base = sorted ? index.orders[sortMode] : (index.filters[filterMode] || index.filters.all);
+        const checkMatch = sorted && filterMode !== 'all';
+        const wantMatched = filterMode === 'on' ? 1 : 0;
+        const view = [];
+        for (let k = 0; k < base.length; k++) {
+            const i = base[k];
+            if (!alive[i]) continue;
+            if (checkMatch && matchedMask[i] !== wantMatched) continue;
+            if (inRange && !inRange[i]) continue;
+            view.push(i);
+        }
+        return view;
+    };
+
+    window.downloadReportCSV = function(rows, prefix) {
+        const esc = (field) => {
+            const s = String(field == null ? '' : field);
+            const doubled = s.split('"').join('""');
+            return /[",\r\n]/.test(s) ? '"' + doubled + '"' : doubled;
+        };
+        const csv = rows.map((r) => r.map(esc).join(',')).join('\r\n');
+        // UTF-8 BOM 추가하여 Excel에서 한글/CSV 인코딩 문제 해결
+        const blob = new Blob([new Uint8Array([0xEF, 0xBB, 0xBF]), csv], { type: 'text/csv;charset=utf-8;' });
+        const url = URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        const now = new Date();
+        const pad = (n) => (n < 10 ? '0' + n : n);
+        const ts = '' + now.getFullYear() + pad(now.getMonth() + 1) + pad(now.getDate()) + '_'
+            + pad(now.getHours()) + pad(now.getMinutes()) + pad(now.getSeconds());
+        a.href = url;
+        a.download = prefix + ts + '.csv';
+        document.body.appendChild(a);
+        a.click();
+        setTimeout(() => { URL.revokeObjectURL(url); a.remove(); }, 0);
+    };
+
+    window.reportTotalPrice = (i) => (prices[i] || 0) + ((index.deliveries || [])[i] || 0);
+
+    // 정렬/가격 범위 컨트롤
+    const sortSelect = document.getElementById('sort-mode');
+    const minInput = document.getElementById('price-min');
+    const maxInput = document.getElementById('price-max');
+    const readPrice = (el) => {
+        const v = el && el.value.trim() !== '' ? parseInt(el.value, 10) : NaN;
+        return isNaN(v) ? null : v;
+    };
+    if (sortSelect) {
+        sortSelect.addEventListener('change', () => { sortMode = sortSelect.value; applyFilter(); });
+    }
+    [sortSelect, minInput, maxInput].forEach((el) => {
+        if (!el) return;
+        // 입력 중 숫자/H/Delete 키가 리포트 단축키로 처리되지 않도록 차단
+        el.addEventListener('keydown', (event) => event.stopPropagation());
+        el.addEventListener('click', (event) => event.stopPropagation());
+        if (el !== sortSelect) {
+            el.addEventListener('input', () => {
+                priceRange = [readPrice(minInput), readPrice(maxInput)];
+                applyFilter();
+            });
+        }
+    });
+})()"""
+
+# 카드 리포트 스크립트 - 카드 노드를 한 번만 수집해 두고 인덱스 결과 순서대로 다시 배치
+CARDS_REPORT_JS = r"""(() => {
+    const grid = document.getElementById('products-grid');
+    // 가상 스크롤 리포트(report-data 있음)에서는 동작하지 않음
+    if (!grid || !window.computeReportView || document.getElementById('report-data')) return;
+    const nodes = [];
+    grid.querySelectorAll('.product-card').forEach((card) => {
+        nodes[parseInt(card.getAttribute('data-product-id'), 10)] = card;
+    });
+    const csvPrefix = document.getElementById('report-index').getAttribute('data-csv-prefix') || 'products_';
+    const alive = new Uint8Array(nodes.length).fill(1);
+    let view = [];
+
+    window.updateTotalCount = function() {
+        const el = document.getElementById('total-count');
+        if (el) el.textContent = el.textContent.replace(/\d[\d,]*/, String(view.length));
+    };
+
+    window.applyFilter = function() {
+        view = computeReportView(alive);
+        const fragment = document.createDocumentFragment();
+        view.forEach((i) => {
+            const card = nodes[i];
+            card.style.display = '';
+            // 화면 밖에 있던 동안 바뀐 하이라이트/선택 상태 반영
+            card.classList.toggle('matched', highlightEnabled && isReportMatched(i));
+            card.classList.toggle('selected', selectedCards.has(String(i)));
+            fragment.appendChild(card);
+        });
+        grid.replaceChildren(fragment);
+        updateTotalCount();
+    };
+
+    window.selectAllPageCards = function() {
+        const before = selectedCards.size;
+        view.forEach((i) => {
+            selectedCards.add(String(i));
+            nodes[i].classList.add('selected');
+        });
+        if (selectedCards.size !== before) updateSelectionInfo();
+    };
+
+    window.deleteSelectedCards = function() {
+        if (selectedCards.size === 0) return;
+        // 선택된 카드들을 삭제 (확인 과정 없이 바로 삭제)
+        selectedCards.forEach((id) => {
+            const i = parseInt(id, 10);
+            alive[i] = 0;
+            if (nodes[i]) nodes[i].style.animation = 'fadeOut 0.3s ease-out';
+        });
+        selectedCards.clear();
+        updateSelectionInfo();
+        setTimeout(applyFilter, 300);
+    };
+
+    window.exportVisibleToCSV = function() {
+        try {
+            if (view.length === 0) {
+                alert('내보낼 상품이 없습니다.');
+                return;
+            }
+            const rows = [['상품명', '전체가격(판매가+배송비)']];
+            view.forEach((i) => {
+                const title = nodes[i].querySelector('.product-title');
+                rows.push([title ? (title.textContent || '').trim() : '', String(reportTotalPrice(i))]);
+            });
+            downloadReportCSV(rows, csvPrefix);
+        } catch (e) {
+            console.error('CSV 내보내기 실패:', e);
+            alert('CSV 내보내기 중 오류가 발생했습니다. 콘솔을 확인하세요.');
+        }
+    };
+
+    applyFilter();
+})()"""
+
+# 가상 스크롤 리포트 스크립트 - 상품 데이터(JSON)에서 보이는 구간의 카드만 렌더링
+# 기본 리포트 스크립트 뒤에 실행되어 필터/선택/삭제/CSV 함수를 데이터 배열 기반으로 교체한다.
+VIRTUAL_REPORT_JS = r"""(() => {
+    const dataEl = document.getElementById('report-data');
+    const grid = document.getElementById('products-grid');
+    if (!dataEl || !grid) return;
+    // 행: [이름HTML, 판매처HTML, 이름, 가격, 배송비, 썸네일, 매칭(0/1), 매칭 그룹(공백 구분)]
+    const items = JSON.parse(dataEl.textContent || '[]');
+    const indexEl = document.getElementById('report-index');
+    const csvPrefix = (indexEl && indexEl.getAttribute('data-csv-prefix')) || 'products_';
+    const alive = new Uint8Array(items.length).fill(1);
+    const OVERSCAN_ROWS = 4;
+    let view = [];
+    let columns = 1;
+    let rowHeight = 0;
+    let rendered = '';
+    let pending = false;
+
+    const escAttr = (s) => String(s == null ? '' : s)
+        .split('&').join('&amp;').split('"').join('&quot;').split('<').join('&lt;');
+    const won = (v) => (parseInt(v, 10) || 0).toLocaleString('en-US') + '원';
+
+    function cardHtml(i) {
+        const it = items[i];
+        let cls = 'product-card';
+        if (it[6] && highlightEnabled) cls += ' matched';
+        if (selectedCards.has(String(i))) cls += ' selected';
+        const freeDelivery = it[4] === '0' || it[4] === '';
+        const image = it[5]
+            ? '<img src="' + escAttr(it[5]) + '" alt="' + escAttr(it[2]) + '" class="product-image" loading="lazy" '
+              + 'onerror="this.style.display=\'none\'; this.nextElementSibling.style.display=\'flex\';">'
+              + '<div class="no-image" style="display:none;">이미지 없음</div>'
+            : '<div class="no-image">이미지 없음</div>';
+        return '<div class="' + cls + '" data-product-id="' + i + '" data-matched="' + (it[6] ? 1 : 0)
+            + '" data-groups="' + escAttr(it[7]) + '" data-price="' + escAttr(it[3]) + '" data-delivery="' + escAttr(it[4]) + '" onclick="toggleSelection(this)">'
+            + image
+            + '<div class="product-info">'
+            + '<div class="product-mall">' + it[1] + '</div>'
+            + '<div class="product-title">' + it[0] + '</div>'
+            + '<div class="product-price">' + (it[3] ? won(it[3]) : '가격 정보 없음') + '</div>'
+            + '<div class="' + (freeDelivery ? 'product-delivery' : 'product-delivery paid') + '">'
+            + (freeDelivery ? '무료배송' : '배송비 ' + won(it[4])) + '</div>'
+            + '</div></div>';
+    }
+
+    function measure() {
+        const style = getComputedStyle(grid);
+        const cols = Math.max(1, style.gridTemplateColumns.split(' ').filter(Boolean).length);
+        let changed = cols !== columns;
+        columns = cols;
+        let tallest = rowHeight;
+        grid.querySelectorAll('.product-card').forEach((card) => {
+            tallest = Math.max(tallest, card.scrollHeight);
+        });
+        if (tallest !== rowHeight) {
+            rowHeight = tallest;
+            grid.style.gridAutoRows = rowHeight + 'px';
+            changed = true;
+        }
+        return changed;
+    }
+
+    function render(force) {
+        pending = false;
+        const gap = parseFloat(getComputedStyle(grid).rowGap) || 0;
+        const stride = (rowHeight || 320) + gap;
+        const totalRows = Math.ceil(view.length / columns);
+        const gridTop = grid.getBoundingClientRect().top + window.scrollY;
+        const top = window.scrollY - gridTop;
+        const firstRow = Math.min(Math.max(0, Math.floor(top / stride) - OVERSCAN_ROWS), Math.max(0, totalRows - 1));
+        const lastRow = Math.min(totalRows, Math.ceil((top + window.innerHeight) / stride) + OVERSCAN_ROWS);
+        const key = firstRow + ':' + lastRow + ':' + columns + ':' + view.length;
+        if (!force && key === rendered) return;
+        rendered = key;
+        const html = [];
+        for (let k = firstRow * columns; k < Math.min(view.length, lastRow * columns); k++) {
+            html.push(cardHtml(view[k]));
+        }
+        grid.style.paddingTop = (firstRow * stride) + 'px';
+        grid.style.paddingBottom = (Math.max(0, totalRows - lastRow) * stride) + 'px';
+        grid.innerHTML = html.join('');
+        // 열 수가 바뀌었거나 렌더링된 카드가 기존 추정보다 크면 다시 배치
+        if (measure()) render(true);
+    }
+
+    function schedule() {
+        if (pending) return;
+        pending = true;
+        requestAnimationFrame(() => render(false));
+    }
+
+    function rebuildView() {
+        view = computeReportView(alive);
+    }
+
+    window.updateTotalCount = function() {
+        const el = document.getElementById('total-count');
+        if (el) el.textContent = el.textContent.replace(/\d[\d,]*/, String(view.length));
+    };
+
+    window.applyFilter = function() {
+        rebuildView();
+        updateTotalCount();
+        render(true);
+    };
+
+    window.selectAllPageCards = function() {
+        const before = selectedCards.size;
+        view.forEach((i) => selectedCards.add(String(i)));
+        if (selectedCards.size !== before) {
+            render(true);
+            updateSelectionInfo();
+        }
+    };
+
+    window.deleteSelectedCards = function() {
+        if (selectedCards.size === 0) return;
+        selectedCards.forEach((id) => { alive[parseInt(id, 10)] = 0; });
+        selectedCards.clear();
+        updateSelectionInfo();
+        applyFilter();
+    };
+
+    window.exportVisibleToCSV = function() {
+        try {
+            if (view.length === 0) {
+                alert('내보낼 상품이 없습니다.');
+                return;
+            }
+            const rows = [['상품명', '전체가격(판매가+배송비)']];
+            view.forEach((i) => rows.push([items[i][2], String(reportTotalPrice(i))]));
+            downloadReportCSV(rows, csvPrefix);
+        } catch (e) {
+            console.error('CSV 내보내기 실패:', e);
+            alert('CSV 내보내기 중 오류가 발생했습니다. 콘솔을 확인하세요.');
+        }
+    };
+
+    window.addEventListener('scroll', schedule, { passive: true });
+    window.addEventListener('resize', () => {
+        // 열 수/카드 폭이 바뀌므로 행 높이를 다시 측정
+        rowHeight = 0;
+        grid.style.gridAutoRows = '';
+        render(true);
+    });
+    rebuildView();
+    updateTotalCount();
+    render(true);
+})()"""
+
+
+def build_report_js():
+    """리포트 기본 스크립트 (선택/삭제/하이라이트/필터/테마/CSV) - 리포트별 값 없이 정적"""
+    return """        let selectedCards = new Set();
+        let highlightEnabled = true;
+    let filterMode = 'all'; // 'all' | 'on' | 'off'
+        // 테마 토글 유지
+        (function(){
+            try {
+                const saved = localStorage.getItem('theme');
+                if (saved === 'dark' || saved === 'light') {
+                    document.documentElement.setAttribute('data-theme', saved);
+                }
+            } catch (e) {}
+        })();
+
+        // 화면 가시성 판단 함수들
+        function isCardVisible(card) {
+            // display:none 이거나 DOM에서 보이지 않으면 제외
+            return card && card.offsetParent !== null && card.style.display !== 'none';
+        }
+
+        // 현재 페이지(필터 적용 후 보이는 모든 카드) 전체 선택
+        function selectAllPageCards() {
+            const cards = document.querySelectorAll('.product-card');
+            let changed = 0;
+            cards.forEach(card => {
+                // 필터로 숨겨진 카드(display:none)는 제외하고, 실제로 보이는 카드만 선택
+                if (isCardVisible(card) && card.style.display !== 'none') {
+                    const productId = card.getAttribute('data-product-id');
+                    if (!selectedCards.has(productId)) {
+                        selectedCards.add(productId);
+                        card.classList.add('selected');
+                        changed++;
+                    }
+                }
+            });
+            if (changed > 0) {
+                updateSelectionInfo();
+            }
+        }
+        
+        function toggleHighlight() {
+            highlightEnabled = !highlightEnabled;
+            const toggleBtn = document.getElementById('highlight-toggle');
+            const body = document.body;
+
+            if (highlightEnabled) {
+                // 하이라이트 켜기: 텍스트는 그대로 두고 스타일만 복원
+                body.classList.remove('no-highlight');
+                // 매칭 카드 테두리 복원
+                document.querySelectorAll('.product-card[data-matched="1"]').forEach(card => card.classList.add('matched'));
+                toggleBtn.textContent = '하이라이트 ON';
+                toggleBtn.classList.remove('off');
+            } else {
+                // 하이라이트 끄기: 텍스트 유지, 스타일만 제거
+                body.classList.add('no-highlight');
+                // 매칭 카드 테두리 제거
+                document.querySelectorAll('.product-card[data-matched="1"]').forEach(card => card.classList.remove('matched'));
+                toggleBtn.textContent = '하이라이트 OFF';
+                toggleBtn.classList.add('off');
+            }
+        }
+        
+        function toggleSelection(card) {
+            const productId = card.getAttribute('data-product-id');
+            
+            if (selectedCards.has(productId)) {
+                selectedCards.delete(productId);
+                card.classList.remove('selected');
+            } else {
+                selectedCards.add(productId);
+                card.classList.add('selected');
+            }
+            
+            updateSelectionInfo();
+        }
+        
+        function updateSelectionInfo() {
+            const selectedCount = selectedCards.size;
+            const deleteInfo = document.getElementById('delete-info');
+            const selectedCountSpan = document.getElementById('selected-count');
+            
+            if (selectedCount > 0) {
+                deleteInfo.style.display = 'block';
+                selectedCountSpan.textContent = selectedCount;
+            } else {
+                deleteInfo.style.display = 'none';
+            }
+        }
+        
+        function deleteSelectedCards() {
+            if (selectedCards.size === 0) {
+                return;
+            }
+            
+            // 선택된 카드들을 삭제 (확인 과정 없이 바로 삭제)
+            selectedCards.forEach(productId => {
+                const card = document.querySelector(`[data-product-id="${productId}"]`);
+                if (card) {
+                    card.style.animation = 'fadeOut 0.3s ease-out';
+                    setTimeout(() => {
+                        card.remove();
+                        updateTotalCount();
+                    }, 300);
+                }
+            });
+            
+            selectedCards.clear();
+            updateSelectionInfo();
+        }
+        
+        function updateTotalCount() {
+            // 보이는 카드만 집계
+            const remainingCards = Array.from(document.querySelectorAll('.product-card')).filter(c => c.style.display !== 'none').length;
+            const totalCountElement = document.getElementById('total-count');
+            totalCountElement.textContent = `총 상품 수: ${remainingCards}개`;
+        }
+
+        function setFilterMode(mode) {
+            filterMode = mode;
+            // 버튼 선택 상태 업데이트
+            const btnAll = document.getElementById('filter-all');
+            const btnOn = document.getElementById('filter-on');
+            const btnOff = document.getElementById('filter-off');
+            [btnAll, btnOn, btnOff].forEach(btn => btn && btn.classList.remove('selected'));
+            if (mode === 'all' && btnAll) btnAll.classList.add('selected');
+            if (mode === 'on' && btnOn) btnOn.classList.add('selected');
+            if (mode === 'off' && btnOff) btnOff.classList.add('selected');
+            applyFilter();
+        }
+
+        function applyFilter() {
+            const cards = document.querySelectorAll('.product-card');
+            cards.forEach(card => {
+                const matched = card.getAttribute('data-matched') === '1';
+                if (filterMode === 'all') {
+                    card.style.display = '';
+                } else if (filterMode === 'on') {
+                    card.style.display = matched ? '' : 'none';
+                } else if (filterMode === 'off') {
+                    card.style.display = matched ? 'none' : '';
+                }
+            });
+            updateTotalCount();
+        }
+        
+        // 키보드 단축키 이벤트 리스너
+        document.addEventListener('keydown', function(event) {
+            // 입력 필드/편집 영역에서는 기본 Ctrl+A 동작을 유지
+            const tag = (event.target && event.target.tagName || '').toLowerCase();
+            const isEditable = event.target && (event.target.isContentEditable || tag === 'input' || tag === 'textarea' || tag === 'select');
+            
+            // Ctrl+A: 현재 페이지의 모든 상품 전체 선택(필터 적용)
+            if (!isEditable && event.ctrlKey && (event.key === 'a' || event.key === 'A')) {
+                event.preventDefault();
+                event.stopPropagation();
+                selectAllPageCards();
+                return;
+            }
+            if (event.key === 'Delete' || event.key === 'Del') {
+                deleteSelectedCards();
+            }
+            
+            // Escape 키로 선택 해제
+            if (event.key === 'Escape') {
+                selectedCards.forEach(productId => {
+                    const card = document.querySelector(`[data-product-id="${productId}"]`);
+                    if (card) {
+                        card.classList.remove('selected');
+                    }
+                });
+                selectedCards.clear();
+                updateSelectionInfo();
+            }
+            
+            // H 키로 하이라이트 토글 (키워드가 있는 경우에만)
+            if (event.key === 'h' || event.key === 'H') {
+                const toggleBtn = document.getElementById('highlight-toggle');
+                if (toggleBtn) {
+                    toggleHighlight();
+                }
+            }
+
+            // 1/2/3 단축키로 필터 변경 (키워드 있을 때만 동작)
+            if (document.getElementById('filter-all')) {
+                if (event.key === '1') setFilterMode('all');
+                if (event.key === '2') setFilterMode('on');
+                if (event.key === '3') setFilterMode('off');
+            }
+        });
+        
+        function toggleTheme() {
+            try {
+                const el = document.documentElement;
+                const cur = el.getAttribute('data-theme') || 'light';
+                const next = cur === 'light' ? 'dark' : 'light';
+                el.setAttribute('data-theme', next);
+                try { localStorage.setItem('theme', next); } catch (e) {}
+            } catch (e) {}
+        }
+        
+        // 초기화 시 사용법 안내
+        console.log('💡 사용법:');
+        console.log('- 상품카드를 클릭하여 선택/해제');
+        console.log('- Delete 키를 눌러 선택된 상품들 삭제');
+    console.log('- Escape 키를 눌러 모든 선택 해제');
+    console.log('- H 키를 눌러 하이라이트 온/오프');
+    console.log('- Ctrl+A로 현재 페이지 전체 선택(필터 적용)');
+    if (document.getElementById('filter-all')) console.log('- 1/2/3 키로 전체/ON만/OFF만 보기');
+
+    // 초기 필터 적용 (키워드가 있는 경우에만 컨트롤 보임)
+    if (document.getElementById('filter-all')) setFilterMode('all');
+
+    // CSV 다운로드: 현재 보이는(필터/삭제 반영) 상품들만 내보내기
+    function exportVisibleToCSV() {
+        try {
+            const cards = Array.from(document.querySelectorAll('.product-card'))
+                .filter(function(c) { return c.style.display !== 'none'; });
+            if (cards.length === 0) {
+                alert('내보낼 상품이 없습니다.');
+                return;
+            }
+            // 헤더
+            const rows = [['상품명', '전체가격(판매가+배송비)']];
+            const getText = function(el, sel) {
+                const n = el.querySelector(sel);
+                return n ? (n.textContent || '').trim() : '';
+            };
+            cards.forEach(function(card) {
+                const name = getText(card, '.product-title');
+                const priceNum = parseInt(card.getAttribute('data-price') || '0', 10) || 0;
+                const deliveryNum = parseInt(card.getAttribute('data-delivery') || '0', 10) || 0;
+                const total = priceNum + deliveryNum;
+                rows.push([name, String(total)]);
+            });
+            // CSV 인코딩: 정규식 없이 안전하게(쉼표/따옴표/개행 포함 시 따옴표로 감싸고 내부 따옴표 이스케이프)
+            const esc = function(field) {
+                const s = String((field === null || field === undefined) ? '' : field);
+                const needsQuote = (s.indexOf('"') !== -1) || (s.indexOf(',') !== -1) || (s.indexOf('\\n') !== -1) || (s.indexOf('\\r') !== -1);
+                const doubled = s.split('"').join('""');
+                return needsQuote ? '"' + doubled + '"' : doubled;
+            };
+            const csv = rows.map(function(r) { return r.map(esc).join(','); }).join('\\r\\n');
+            // UTF-8 BOM 추가하여 Excel에서 한글/CSV 인코딩 문제 해결
+            const bom = new Uint8Array([0xEF, 0xBB, 0xBF]);
+            const blob = new Blob([bom, csv], { type: 'text/csv;charset=utf-8;' });
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            var now = new Date();
+            var pad = function(n) { return (n < 10 ? '0' + n : n); };
+            var ts = '' + now.getFullYear() + pad(now.getMonth() + 1) + pad(now.getDate()) + '_' + pad(now.getHours()) + pad(now.getMinutes()) + pad(now.getSeconds());
+            a.href = url;
+            a.download = 'products_' + ts + '.csv';
+            document.body.appendChild(a);
+            a.click();
+            setTimeout(function() {
+                URL.revokeObjectURL(url);
+                a.remove();
+            }, 0);
+        } catch (e) {
+            console.error('CSV 내보내기 실패:', e);
+            alert('CSV 내보내기 중 오류가 발생했습니다. 콘솔을 확인하세요.');
+        }
+    }
+"""
+
+REPORT_SORT_OPTIONS = (
+    ('default', '기본 순서'),
+    ('price_asc', '가격 낮은순'),
+    ('price_desc', '가격 높은순'),
+    ('delivery_asc', '배송비 낮은순'),
+    ('total_asc', '총액(가격+배송비) 낮은순'),
+    ('total_desc', '총액(가격+배송비) 높은순'),
+)
+
+def _report_number(value):
+    try:
+        return int(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+def build_report_index(products_data, matched_flags):
+    """리포트 정렬/필터용 사전 계산 인덱스 (상품 번호 배열)
+
+    가격 정렬은 가격 있는 상품을 먼저, 가격 없는 상품을 원래 순서로 뒤에 둔다.
+    price_asc 앞쪽 priced 개는 가격 범위 필터의 이진 탐색에도 사용된다.
+    """
+    ids = range(len(products_data))
+    prices = [_report_number(p.get('가격', '')) for p in products_data]
+    deliveries = [_report_number(p.get('배송비', '')) or 0 for p in products_data]
+    totals = [(prices[i] or 0) + deliveries[i] for i in ids]
+    priced = [i for i in ids if prices[i] is not None]
+    unpriced = [i for i in ids if prices[i] is None]
+    return {
+        'count': len(products_data),
+        'priced': len(priced),
+        'prices': prices,
+        'deliveries': deliveries,
+        'filters': {
+            'all': list(ids),
+            'on': [i for i in ids if matched_flags[i]],
+            'off': [i for i in ids if not matched_flags[i]],
+        },
+        'orders': {
+            'price_asc': sorted(priced, key=lambda i: prices[i]) + unpriced,
+            'price_desc': sorted(priced, key=lambda i: -prices[i]) + unpriced,
+            'delivery_asc': sorted(ids, key=lambda i: deliveries[i]),
+            'total_asc': sorted(priced, key=lambda i: totals[i]) + unpriced,
+            'total_desc': sorted(priced, key=lambda i: -totals[i]) + unpriced,
+        },
+    }
+
+def _json_for_script(data):
+    # '<' 를 이스케이프하여 script 태그 안에서도 안전한 JSON
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+
+def iter_html_report_chunks(products_data, timestamp, highlight_keywords=None, progress_callback=None, css_filename=None, mode=None, js_filename=None):
+    """HTML 리포트 생성 - 모든 상품 표시 (선택 삭제 기능 및 키워드 하이라이트 포함)
+
+    헤더/상품 카드/스크립트를 조각(str) 단위로 순서대로 반환한다.
+    css_filename/js_filename 을 주면 CSS/스크립트를 인라인 대신 공유 에셋 링크로 넣는다.
+    mode='virtual' 이면 카드 DOM 대신 상품 데이터를 JSON 으로 한 번만 넣고 보이는 구간만 렌더링한다.
+    """
+    virtual = (mode or get_report_mode(len(products_data))) == 'virtual'
+    virtual_rows = [] if virtual else None
+    total_products = len(products_data)
+    current_time = datetime.now().strftime("%Y년 %m월 %d일 %H:%M:%S")
+    # 진행 로그 주기 제거(요약만 유지)
+    if progress_callback:
+        try:
+            progress_callback(5, "HTML 헤더 구성 중...")
+        except Exception:
+            pass
+    
+    # 이미지 있는 상품 수 계산
+    products_with_image = sum(1 for p in products_data if p.get('썸네일'))
+    
+    # 키워드 매칭 여부 1회 계산 (집계와 카드 표시에 함께 사용)
+    # 매칭(필수 그룹)과 그룹별 매칭을 구분 - watch 등 관찰 그룹만 일치한 상품은 매칭으로 세지 않음
+    matcher = get_keyword_matcher(highlight_keywords) if highlight_keywords else None
+    must_groups = must_match_groups(matcher.groups) if matcher is not None else set()
+    match_groups = [
+        matcher.match_summary(p.get('상품명', ''), p.get('판매처', ''))[1] if matcher is not None else []
+        for p in products_data
+    ]
+    matched_flags = [any(group in must_groups for group in groups) for groups in match_groups]
+    matched_products = sum(matched_flags)
+    group_counts = {}
+    if matcher is not None and len(matcher.groups) > 1:
+        group_counts = {group: sum(group in groups for groups in match_groups) for group in matcher.groups}
+    
+    # 필터 컨트롤 HTML (백슬래시 이스케이프가 필요한 onclick을 f-string 밖에서 구성)
+    filter_controls = ""
+    if highlight_keywords:
+        filter_controls = (
+            '<div class="filter-controls">\n'
             '    <button class="filter-btn selected" id="filter-all" onclick="setFilterMode(\'all\')">전체 보기 (1)</button>\n'
             '    <button class="filter-btn" id="filter-on" onclick="setFilterMode(\'on\')">하이라이트 ON만 (2)</button>\n'
             '    <button class="filter-btn" id="filter-off" onclick="setFilterMode(\'off\')">하이라이트 OFF만 (3)</button>\n'
             '</div>'
         )
 
-    # 추가 콘솔 안내/초기 필터 적용 JS (f-string 내부에서 직접 조건식을 쓰지 않도록 사전 구성)
-    extra_console_tip = "console.log('- 1/2/3 키로 전체/ON만/OFF만 보기');" if highlight_keywords else ""
-    extra_init_filter = "setFilterMode('all');" if highlight_keywords else ""
+    # 정렬/가격 범위 컨트롤 (사전 계산 인덱스로 동작)
+    sort_options = ''.join(f'<option value="{value}">{label}</option>' for value, label in REPORT_SORT_OPTIONS)
+    sort_controls = (
+        '<div class="filter-controls sort-controls">\n'
+        f'    <select class="filter-btn" id="sort-mode">{sort_options}</select>\n'
+        '    <input class="filter-btn" id="price-min" type="number" min="0" placeholder="최소 가격" style="width: 120px;">\n'
+        '    <input class="filter-btn" id="price-max" type="number" min="0" placeholder="최대 가격" style="width: 120px;">\n'
+        '</div>'
+    )
+
 
     # CSS 인라인 또는 링크 결정 (기본: 인라인)
     css_block = (
         f"<style>\n{build_report_css()}\n</style>" if not css_filename else f'<link rel="stylesheet" href="{css_filename}">'
     )
 
-    html = f"""<!DOCTYPE html>
+    yield f"""<!DOCTYPE html>
 <html lang=\"ko\" data-theme=\"light\">
 <head>
     <meta charset=\"UTF-8\">
@@ -667,14 +2053,18 @@ def generate_html_report(products_data, timestamp, highlight_keywords=None, prog
                 <div class=\"stat-item\">이미지 수집: {products_with_image}개</div>"""
     
     if highlight_keywords:
-        html += f"""
+        yield f"""
                 <div class="stat-item highlight">키워드 매칭: {matched_products}개</div>
                 <div class="stat-item highlight">추출 키워드: {len(highlight_keywords)}개</div>"""
+        for group, count in group_counts.items():
+            yield f"""
+                <div class="stat-item">{escape(group)} 매칭: {count}개</div>"""
     
-    html += f"""
+    yield f"""
                 <div class=\"stat-item\">크롤링 ID: {timestamp}</div>
             </div>
             {filter_controls}
+            {sort_controls}
         </div>
         <div class=\"delete-info\" id=\"delete-info\">선택된 상품: <span id=\"selected-count\">0</span>개 | Delete 키로 삭제</div>
         <div class=\"products-grid\" id=\"products-grid\">
@@ -698,16 +2088,10 @@ def generate_html_report(products_data, timestamp, highlight_keywords=None, prog
         product_name = product.get('상품명', '')
         mall_name = product.get('판매처', '')
         
-        is_matched = False
+        is_matched = matched_flags[i]
         if highlight_keywords:
             highlighted_name = highlight_keywords_in_text(product_name, highlight_keywords)
             highlighted_mall = highlight_keywords_in_text(mall_name, highlight_keywords)
-            
-            # 매칭 여부 확인
-            for keyword in highlight_keywords:
-                if keyword.lower() in product_name.lower() or keyword.lower() in mall_name.lower():
-                    is_matched = True
-                    break
         else:
             highlighted_name = product_name
             highlighted_mall = mall_name
@@ -723,8 +2107,11 @@ def generate_html_report(products_data, timestamp, highlight_keywords=None, prog
             img_element = ''
             no_img_element = '<div class="no-image">이미지 없음</div>'
         
-        html += f"""
-            <div class="{card_class}" data-product-id="{i}" data-matched="{1 if is_matched else 0}" data-price="{price or ''}" data-delivery="{delivery}" onclick="toggleSelection(this)">
+        if virtual:
+            virtual_rows.append([highlighted_name, highlighted_mall, product_name, str(price or ''), str(delivery), thumbnail, 1 if is_matched else 0, ' '.join(match_groups[i])])
+        else:
+            yield f"""
+            <div class="{card_class}" data-product-id="{i}" data-matched="{1 if is_matched else 0}" data-groups="{escape(' '.join(match_groups[i]))}" data-price="{price or ''}" data-delivery="{delivery}" onclick="toggleSelection(this)">
                 {img_element}
                 {no_img_element}
                 <div class="product-info">
@@ -744,288 +2131,209 @@ def generate_html_report(products_data, timestamp, highlight_keywords=None, prog
                 pass
     # 진행중 상세 로그는 제거됨
     
-    html += """
+    yield """
         </div>
     </div>
     <a href=\"#\" class=\"floating-btn\" onclick=\"window.scrollTo({top: 0, behavior: 'smooth'}); return false;\">↑ TOP</a>"""
     
     # 키워드가 있는 경우에만 하이라이트 토글 버튼 추가
     if highlight_keywords:
-        html += f"""
+        yield f"""
     <button class=\"highlight-toggle-btn\" id=\"highlight-toggle\" onclick=\"toggleHighlight()\">하이라이트 ON</button>"""
     
-    html += f"""
+    yield f"""
     <button class=\"csv-export-btn\" id=\"csv-export\" onclick=\"exportVisibleToCSV()\">CSV 다운로드</button>
     <button class=\"theme-toggle-btn\" id=\"theme-toggle\" onclick=\"toggleTheme()\">🌓 테마</button>
     
-    <script>
-        let selectedCards = new Set();
-        let highlightEnabled = true;
-    let filterMode = 'all'; // 'all' | 'on' | 'off'
-        // 테마 토글 유지
-        (function(){{
-            try {{
-                const saved = localStorage.getItem('theme');
-                if (saved === 'dark' || saved === 'light') {{
-                    document.documentElement.setAttribute('data-theme', saved);
-                }}
-            }} catch (e) {{}}
-        }})();
+"""
+    if not js_filename:
+        yield f"    <script>\n{build_report_js()}    </script>\n"
+    report_index = _json_for_script(build_report_index(products_data, matched_flags))
+    yield f'<script id="report-index" type="application/json" data-csv-prefix="{REPORT_CSV_PREFIX}">{report_index}</script>\n'
+    if virtual:
+        yield f'<script id="report-data" type="application/json">{_json_for_script(virtual_rows)}</script>\n'
+    if js_filename:
+        # 공유 번들(기본 스크립트 + 인덱스/카드/가상 스크립트)을 데이터 뒤에서 로드
+        yield f'<script src="{js_filename}"></script>\n'
+    else:
+        yield f"<script>\n{REPORT_INDEX_JS}\n</script>\n"
+        yield f"<script>\n{VIRTUAL_REPORT_JS if virtual else CARDS_REPORT_JS}\n</script>\n"
+    yield """</body>
+</html>
+"""
 
-        // 화면 가시성 판단 함수들
-        function isCardVisible(card) {{
-            // display:none 이거나 DOM에서 보이지 않으면 제외
-            return card && card.offsetParent !== null && card.style.display !== 'none';
-        }}
+def generate_html_report(products_data, timestamp, highlight_keywords=None, progress_callback=None, css_filename=None, mode=None, js_filename=None):
+    """HTML 리포트 전체를 문자열로 반환"""
+    return ''.join(iter_html_report_chunks(products_data, timestamp, highlight_keywords, progress_callback, css_filename, mode, js_filename))
 
-        // 현재 페이지(필터 적용 후 보이는 모든 카드) 전체 선택
-        function selectAllPageCards() {{
-            const cards = document.querySelectorAll('.product-card');
-            let changed = 0;
-            cards.forEach(card => {{
-                // 필터로 숨겨진 카드(display:none)는 제외하고, 실제로 보이는 카드만 선택
-                if (isCardVisible(card) && card.style.display !== 'none') {{
-                    const productId = card.getAttribute('data-product-id');
-                    if (!selectedCards.has(productId)) {{
-                        selectedCards.add(productId);
-                        card.classList.add('selected');
-                        changed++;
-                    }}
-                }}
-            }});
-            if (changed > 0) {{
-                updateSelectionInfo();
-            }}
-        }}
-        
-        function toggleHighlight() {{
-            highlightEnabled = !highlightEnabled;
-            const toggleBtn = document.getElementById('highlight-toggle');
-            const body = document.body;
+REPORT_WRITE_BUFFER = 256 * 1024
 
-            if (highlightEnabled) {{
-                // 하이라이트 켜기: 텍스트는 그대로 두고 스타일만 복원
-                body.classList.remove('no-highlight');
-                // 매칭 카드 테두리 복원
-                document.querySelectorAll('.product-card[data-matched="1"]').forEach(card => card.classList.add('matched'));
-                toggleBtn.textContent = '하이라이트 ON';
-                toggleBtn.classList.remove('off');
-            }} else {{
-                // 하이라이트 끄기: 텍스트 유지, 스타일만 제거
-                body.classList.add('no-highlight');
-                // 매칭 카드 테두리 제거
-                document.querySelectorAll('.product-card[data-matched="1"]').forEach(card => card.classList.remove('matched'));
-                toggleBtn.textContent = '하이라이트 OFF';
-                toggleBtn.classList.add('off');
-            }}
-        }}
-        
-        function toggleSelection(card) {{
-            const productId = card.getAttribute('data-product-id');
-            
-            if (selectedCards.has(productId)) {{
-                selectedCards.delete(productId);
-                card.classList.remove('selected');
-            }} else {{
-                selectedCards.add(productId);
-                card.classList.add('selected');
-            }}
-            
-            updateSelectionInfo();
-        }}
-        
-        function updateSelectionInfo() {{
-            const selectedCount = selectedCards.size;
-            const deleteInfo = document.getElementById('delete-info');
-            const selectedCountSpan = document.getElementById('selected-count');
-            
-            if (selectedCount > 0) {{
-                deleteInfo.style.display = 'block';
-                selectedCountSpan.textContent = selectedCount;
-            }} else {{
-                deleteInfo.style.display = 'none';
-            }}
-        }}
-        
-        function deleteSelectedCards() {{
-            if (selectedCards.size === 0) {{
-                return;
-            }}
-            
-            // 선택된 카드들을 삭제 (확인 과정 없이 바로 삭제)
-            selectedCards.forEach(productId => {{
-                const card = document.querySelector(`[data-product-id="${{productId}}"]`);
-                if (card) {{
-                    card.style.animation = 'fadeOut 0.3s ease-out';
-                    setTimeout(() => {{
-                        card.remove();
-                        updateTotalCount();
-                    }}, 300);
-                }}
-            }});
-            
-            selectedCards.clear();
-            updateSelectionInfo();
-        }}
-        
-        function updateTotalCount() {{
-            // 보이는 카드만 집계
-            const remainingCards = Array.from(document.querySelectorAll('.product-card')).filter(c => c.style.display !== 'none').length;
-            const totalCountElement = document.getElementById('total-count');
-            totalCountElement.textContent = `총 상품 수: ${{remainingCards}}개`;
-        }}
+def write_html_report(path, products_data, timestamp, highlight_keywords=None, progress_callback=None, css_filename=None, mode=None, js_filename=None):
+    """HTML 리포트를 조각 단위로 파일에 바로 기록 (문서 전체를 메모리에 두지 않음)
+
+    임시 파일(.part)에 쓴 뒤 교체하므로 중간에 실패해도 반쯤 쓰인 리포트가 남지 않는다.
+    """
+    tmp_path = path + '.part'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', buffering=REPORT_WRITE_BUFFER) as htmlfile:
+            for chunk in iter_html_report_chunks(products_data, timestamp, highlight_keywords, progress_callback, css_filename, mode, js_filename):
+                htmlfile.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
 
-        function setFilterMode(mode) {{
-            filterMode = mode;
-            // 버튼 선택 상태 업데이트
-            const btnAll = document.getElementById('filter-all');
-            const btnOn = document.getElementById('filter-on');
-            const btnOff = document.getElementById('filter-off');
-            [btnAll, btnOn, btnOff].forEach(btn => btn && btn.classList.remove('selected'));
-            if (mode === 'all' && btnAll) btnAll.classList.add('selected');
-            if (mode === 'on' && btnOn) btnOn.classList.add('selected');
-            if (mode === 'off' && btnOff) btnOff.classList.add('selected');
-            applyFilter();
-        }}
+REPORT_ASSET_DIRNAME = "assets"
+_report_assets_cache = {}
 
-        function applyFilter() {{
-            const cards = document.querySelectorAll('.product-card');
-            cards.forEach(card => {{
-                const matched = card.getAttribute('data-matched') === '1';
-                if (filterMode === 'all') {{
-                    card.style.display = '';
-                }} else if (filterMode === 'on') {{
-                    card.style.display = matched ? '' : 'none';
-                }} else if (filterMode === 'off') {{
-                    card.style.display = matched ? 'none' : '';
-                }}
-            }});
-            updateTotalCount();
-        }}
-        
-        // 키보드 단축키 이벤트 리스너
-        document.addEventListener('keydown', function(event) {{
-            // 입력 필드/편집 영역에서는 기본 Ctrl+A 동작을 유지
-            const tag = (event.target && event.target.tagName || '').toLowerCase();
-            const isEditable = event.target && (event.target.isContentEditable || tag === 'input' || tag === 'textarea' || tag === 'select');
-            
-            // Ctrl+A: 현재 페이지의 모든 상품 전체 선택(필터 적용)
-            if (!isEditable && event.ctrlKey && (event.key === 'a' || event.key === 'A')) {{
-                event.preventDefault();
-                event.stopPropagation();
-                selectAllPageCards();
-                return;
-            }}
-            if (event.key === 'Delete' || event.key === 'Del') {{
-                deleteSelectedCards();
-            }}
-            
-            // Escape 키로 선택 해제
-            if (event.key === 'Escape') {{
-                selectedCards.forEach(productId => {{
-                    const card = document.querySelector(`[data-product-id="${{productId}}"]`);
-                    if (card) {{
-                        card.classList.remove('selected');
-                    }}
-                }});
-                selectedCards.clear();
-                updateSelectionInfo();
-            }}
-            
-            // H 키로 하이라이트 토글 (키워드가 있는 경우에만)
-            if (event.key === 'h' || event.key === 'H') {{
-                const toggleBtn = document.getElementById('highlight-toggle');
-                if (toggleBtn) {{
-                    toggleHighlight();
-                }}
-            }}
+def get_report_assets_mode():
+    """리포트 CSS/JS 배치 방식 (REPORT_ASSETS=inline|external, 기본 inline)"""
+    mode = os.getenv('REPORT_ASSETS', 'inline').strip().lower()
+    return mode if mode in ('inline', 'external') else 'inline'
 
-            // 1/2/3 단축키로 필터 변경 (키워드 있을 때만 동작)
-            if ({'true' if highlight_keywords else 'false'}) {{
-                if (event.key === '1') setFilterMode('all');
-                if (event.key === '2') setFilterMode('on');
-                if (event.key === '3') setFilterMode('off');
-            }}
-        }});
-        
-        function toggleTheme() {{
-            try {{
-                const el = document.documentElement;
-                const cur = el.getAttribute('data-theme') || 'light';
-                const next = cur === 'light' ? 'dark' : 'light';
-                el.setAttribute('data-theme', next);
-                try {{ localStorage.setItem('theme', next); }} catch (e) {{}}
-            }} catch (e) {{}}
-        }}
-        
-        // 초기화 시 사용법 안내
-        console.log('💡 사용법:');
-        console.log('- 상품카드를 클릭하여 선택/해제');
-        console.log('- Delete 키를 눌러 선택된 상품들 삭제');
-    console.log('- Escape 키를 눌러 모든 선택 해제');
-    console.log('- H 키를 눌러 하이라이트 온/오프');
-    console.log('- Ctrl+A로 현재 페이지 전체 선택(필터 적용)');
-    {extra_console_tip}
+def strip_remote_imports(css):
+    """외부 폰트 등 원격 @import 제거 (공유 에셋은 네트워크 없이 열리도록)"""
+    return re.sub(r"^\s*@import\s+url\([^)]*\)\s*;\s*\n?", "", css, flags=re.M)
 
-    // 초기 필터 적용 (키워드가 있는 경우에만 컨트롤 보임)
-    {extra_init_filter}
+def build_report_bundle_js():
+    return ";\n".join([build_report_js().strip(), REPORT_INDEX_JS, CARDS_REPORT_JS, VIRTUAL_REPORT_JS]) + ";\n"
 
-    // CSV 다운로드: 현재 보이는(필터/삭제 반영) 상품들만 내보내기
-    function exportVisibleToCSV() {{
-        try {{
-            const cards = Array.from(document.querySelectorAll('.product-card'))
-                .filter(function(c) {{ return c.style.display !== 'none'; }});
-            if (cards.length === 0) {{
-                alert('내보낼 상품이 없습니다.');
-                return;
-            }}
-            // 헤더
-            const rows = [['상품명', '전체가격(판매가+배송비)']];
-            const getText = function(el, sel) {{
-                const n = el.querySelector(sel);
-                return n ? (n.textContent || '').trim() : '';
-            }};
-            cards.forEach(function(card) {{
-                const name = getText(card, '.product-title');
-                const priceNum = parseInt(card.getAttribute('data-price') || '0', 10) || 0;
-                const deliveryNum = parseInt(card.getAttribute('data-delivery') || '0', 10) || 0;
-                const total = priceNum + deliveryNum;
-                rows.push([name, String(total)]);
-            }});
-            // CSV 인코딩: 정규식 없이 안전하게(쉼표/따옴표/개행 포함 시 따옴표로 감싸고 내부 따옴표 이스케이프)
-            const esc = function(field) {{
-                const s = String((field === null || field === undefined) ? '' : field);
-                const needsQuote = (s.indexOf('"') !== -1) || (s.indexOf(',') !== -1) || (s.indexOf('\\n') !== -1) || (s.indexOf('\\r') !== -1);
-                const doubled = s.split('"').join('""');
-                return needsQuote ? '"' + doubled + '"' : doubled;
-            }};
-            const csv = rows.map(function(r) {{ return r.map(esc).join(','); }}).join('\\r\\n');
-            // UTF-8 BOM 추가하여 Excel에서 한글/CSV 인코딩 문제 해결
-            const bom = new Uint8Array([0xEF, 0xBB, 0xBF]);
-            const blob = new Blob([bom, csv], {{ type: 'text/csv;charset=utf-8;' }});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            var now = new Date();
-            var pad = function(n) {{ return (n < 10 ? '0' + n : n); }};
-            var ts = '' + now.getFullYear() + pad(now.getMonth() + 1) + pad(now.getDate()) + '_' + pad(now.getHours()) + pad(now.getMinutes()) + pad(now.getSeconds());
-            a.href = url;
-            a.download = 'products_' + ts + '.csv';
-            document.body.appendChild(a);
-            a.click();
-            setTimeout(function() {{
-                URL.revokeObjectURL(url);
-                a.remove();
-            }}, 0);
-        }} catch (e) {{
-            console.error('CSV 내보내기 실패:', e);
-            alert('CSV 내보내기 중 오류가 발생했습니다. 콘솔을 확인하세요.');
-        }}
-    }}
-    </script>
+def write_report_assets(results_dir):
+    """내용 해시로 버전이 붙은 리포트 CSS/JS 를 results/assets 에 기록 -> (CSS 상대경로, JS 상대경로)
+
+    같은 내용이면 같은 파일명을 재사용하므로 여러 리포트가 브라우저 캐시를 공유한다.
+    """
+    cached = _report_assets_cache.get(results_dir)
+    if cached:
+        return cached
+    assets_dir = os.path.join(results_dir, REPORT_ASSET_DIRNAME)
+    os.makedirs(assets_dir, exist_ok=True)
+    links = []
+    for ext, content in (('css', strip_remote_imports(build_report_css())), ('js', build_report_bundle_js())):
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]
+        name = f"report-{digest}.{ext}"
+        path = os.path.join(assets_dir, name)
+        if not os.path.exists(path):
+            tmp_path = path + '.part'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        links.append(f"{REPORT_ASSET_DIRNAME}/{name}")
+    _report_assets_cache[results_dir] = tuple(links)
+    return _report_assets_cache[results_dir]
+
+def render_query_outputs(job):
+    """검색어 하나의 CSV/JSON/HTML 작성 (리포트 프로세스 풀에서 실행) -> 요약 dict"""
+    t0 = perf_counter()
+    set_keyword_groups(job.get('keyword_groups'))
+    products_data = job['products']
+    base = os.path.join(job['results_dir'], f"{job['file_prefix']}_{job['timestamp']}")
+    write_products_csv(base + '.csv', products_data)
+    write_products_json(base + '.json', products_data)
+    write_html_report(base + '.html', products_data, job['timestamp'], job['keywords'],
+                      css_filename=job.get('css_link'), js_filename=job.get('js_link'))
+    return {
+        'query': job['query'],
+        'count': len(products_data),
+        'matched': sum(1 for p in products_data if p.get('매칭')),
+        'files': {ext: os.path.basename(f"{base}.{ext}") for ext in ('html', 'csv', 'json')},
+        'seconds': perf_counter() - t0,
+    }
+
+def write_batch_index(results_dir, summaries, timestamp=None):
+    """배치 결과 색인 페이지 (검색어별 리포트/CSV/JSON 링크) -> 경로"""
+    timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+    rows = []
+    for summary in summaries:
+        files = summary['files']
+        link = lambda ext, label: f'<a href="{quote(files[ext])}">{label}</a>'
+        rows.append(
+            f"<tr><td>{link('html', escape(summary['query']))}</td>"
+            f"<td>{summary['count']:,}</td><td>{summary['matched']:,}</td>"
+            f"<td>{link('csv', 'CSV')} · {link('json', 'JSON')}</td></tr>"
+        )
+    page = f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>배치 수집 결과 - {timestamp}</title>
+    <style>
+        body {{ font-family: 'Segoe UI', 'Malgun Gothic', sans-serif; margin: 32px; color: #1f2937; }}
+        table {{ border-collapse: collapse; width: 100%; max-width: 960px; }}
+        th, td {{ border-bottom: 1px solid #e5e7eb; padding: 10px 12px; text-align: left; }}
+        th {{ background: #f3f4f6; }}
+        td:nth-child(2), td:nth-child(3) {{ text-align: right; }}
+    </style>
+</head>
+<body>
+    <h1>배치 수집 결과</h1>
+    <p>검색어 {len(summaries)}개 · 상품 {sum(s['count'] for s in summaries):,}개 · 생성 {timestamp}</p>
+    <table>
+        <thead><tr><th>검색어</th><th>상품 수</th><th>매칭</th><th>데이터</th></tr></thead>
+        <tbody>
+        {''.join(rows)}
+        </tbody>
+    </table>
 </body>
 </html>
 """
-    return html
+    path = os.path.join(results_dir, f"naver_batch_{timestamp}.html")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path
+
+class ReportPipeline:
+    """배치 수집 결과의 CSV/JSON/HTML 을 프로세스 풀에서 병렬 작성하고 마지막에 색인 페이지를 만든다
+
+    수집 루프는 submit 후 바로 다음 검색어로 넘어가며, 저장소(SQLite) 기록은 호출 측(메인 프로세스)에서 한다.
+    """
+
+    def __init__(self, highlight_keywords=None, workers=None):
+        self.highlight_keywords = list(highlight_keywords or [])
+        self.workers = max(1, workers or (os.cpu_count() or 1))
+        self.results_dir = get_results_dir()
+        self.css_link, self.js_link = None, None
+        if get_report_assets_mode() == 'external':
+            self.css_link, self.js_link = write_report_assets(self.results_dir)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.tasks = []
+
+    def submit(self, query, products_data, index=None):
+        job = {
+            'query': query,
+            'file_prefix': query_file_prefix(query, index),
+            'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
+            'products': products_data,
+            'keywords': self.highlight_keywords,
+            'keyword_groups': get_keyword_groups(),
+            'results_dir': self.results_dir,
+            'css_link': self.css_link,
+            'js_link': self.js_link,
+        }
+        loop = asyncio.get_running_loop()
+        self.tasks.append((query, loop.run_in_executor(self.executor, render_query_outputs, job)))
+
+    async def finish(self):
+        """모든 작성 완료 대기 후 색인 페이지 작성 -> 색인 경로 (결과가 없으면 None)"""
+        summaries = []
+        try:
+            for query, task in self.tasks:
+                try:
+                    summary = await task
+                    summaries.append(summary)
+                    log_progress(f"[{query}] 결과 파일 저장 완료 ({summary['count']}개, {summary['seconds']:.2f}s)")
+                except Exception as e:
+                    print(f"[{query}] 결과 파일 저장 오류: {e}")
+        finally:
+            self.executor.shutdown(wait=True)
+        if not summaries:
+            return None
+        return write_batch_index(self.results_dir, summaries)
 
 async def create_ready_button(page):
     """준비완료 버튼 생성"""
@@ -1050,12 +2358,24 @@ async def create_ready_button(page):
                 
                 document.body.insertBefore(button, document.body.firstChild);
                 
+                // 페이지 스크립트가 버튼을 지우면 같은 버튼을 다시 붙임 (DOM 변경 시에만 확인)
+                if (window.__pcReadyGuard) window.__pcReadyGuard.disconnect();
+                window.__pcReadyGuard = new MutationObserver(() => {
+                    if (window.crawlingReady) {
+                        window.__pcReadyGuard.disconnect();
+                        return;
+                    }
+                    if (!button.isConnected && document.body) document.body.insertBefore(button, document.body.firstChild);
+                });
+                window.__pcReadyGuard.observe(document.documentElement, { childList: true, subtree: true });
+
                 button.onclick = function(event) {
                     this.innerHTML = '✅ 크롤링 시작 중...';
                     this.disabled = true;
                     this.style.background = 'linear-gradient(45deg, #4CAF50, #45a049) !important';
                     this.style.cursor = 'not-allowed !important';
                     window.crawlingReady = true;
+                    if (window.__pcReady) window.__pcReady();
                     event.preventDefault();
                 };
                 
@@ -1066,31 +2386,47 @@ async def create_ready_button(page):
         })()
     """)
 
+# 페이지별 준비완료 수신 콜백 (바인딩은 페이지당 1회만 등록 가능하므로 수신처만 교체)
+_ready_sinks = {}
+
+def _dispatch_ready(source):
+    sink = _ready_sinks.get(source.get('page'))
+    if sink:
+        sink()
+
 async def monitor_and_recreate_button(page):
-    """페이지 모니터링 및 버튼 재생성"""
-    current_url = page.url
-    button_ready = False
+    """준비완료 클릭 대기 - 클릭은 바인딩으로 즉시 전달, 새 문서 로드 시에만 버튼 재생성 (폴링 없음)"""
+    ready = asyncio.Event()
+    _ready_sinks[page] = ready.set
+    try:
+        await page.expose_binding('__pcReady', _dispatch_ready)
+    except Exception:
+        pass  # 같은 페이지에 이미 등록됨
     
-    while not button_ready:
+    async def recreate():
         try:
-            new_url = page.url
-            if new_url != current_url:
-                current_url = new_url
-                await page.wait_for_load_state('domcontentloaded')
-                await page.wait_for_timeout(2000)
-                await create_ready_button(page)
-            
-            button_ready = await page.evaluate("window.crawlingReady === true")
-            
-            if not button_ready:
-                button_exists = await page.evaluate("!!document.getElementById('crawling-ready-btn')")
-                if not button_exists:
-                    await create_ready_button(page)
-            
-            await page.wait_for_timeout(1000)
-            
+            await create_ready_button(page)
         except Exception:
-            await page.wait_for_timeout(1000)
+            pass
+    
+    def on_load(_):
+        if not ready.is_set():
+            asyncio.ensure_future(recreate())
+    
+    def on_close(_):
+        ready.set()
+    
+    page.on('domcontentloaded', on_load)
+    page.on('close', on_close)
+    try:
+        # 바인딩 등록 전에 이미 클릭된 경우
+        if await page.evaluate("window.crawlingReady === true"):
+            ready.set()
+        await ready.wait()
+    finally:
+        page.remove_listener('domcontentloaded', on_load)
+        page.remove_listener('close', on_close)
+        _ready_sinks.pop(page, None)
     
     return True
 
@@ -1104,9 +2440,9 @@ async def wait_for_user_ready(page):
     
     await monitor_and_recreate_button(page)
     
-    await page.wait_for_timeout(1000)
     await page.evaluate("""
         (() => {
+            if (window.__pcReadyGuard) window.__pcReadyGuard.disconnect();
             const button = document.getElementById('crawling-ready-btn');
             if (button) button.remove();
         })()
@@ -1170,21 +2506,27 @@ async def create_progress_bar(page, initial_text="HTML 구성 준비 중..."):
         return False
 
 async def update_progress_bar(page, percent, text=None):
-    """진행 게이지 업데이트 (퍼센트/라벨)"""
+    """진행 게이지 업데이트 (퍼센트/라벨, 주입한 갱신 함수 재사용)"""
     try:
         pct = int(max(0, min(100, int(percent))))
         data = {"pct": pct, "text": text}
+        # 처음 한 번만 갱신 함수를 주입하고, 이후에는 작은 호출 스크립트만 실행
+        if await page.evaluate("(data) => window.__pcSetProgress ? (window.__pcSetProgress(data), true) : false", data):
+            return
         await page.evaluate(
             """
             (data) => {
-                const el = document.getElementById('crawling-progress-bar');
-                const label = document.getElementById('crawling-progress-label');
-                if (el && typeof data.pct === 'number') {
-                    el.style.width = `${data.pct}%`;
-                }
-                if (label && data.text) {
-                    label.textContent = data.text;
-                }
+                window.__pcSetProgress = (data) => {
+                    const el = document.getElementById('crawling-progress-bar');
+                    const label = document.getElementById('crawling-progress-label');
+                    if (el && typeof data.pct === 'number') {
+                        el.style.width = `${data.pct}%`;
+                    }
+                    if (label && data.text) {
+                        label.textContent = data.text;
+                    }
+                };
+                window.__pcSetProgress(data);
             }
             """,
             data,
@@ -1265,7 +2607,7 @@ def find_free_port(start=9222, tries=50):
                 port += 1
     return None
 
-def launch_chrome_with_cdp(chrome_path, user_data_dir, profile_dir_name, port):
+def launch_chrome_with_cdp(chrome_path, user_data_dir, profile_dir_name, port, start_url="about:blank"):
     args = [
         chrome_path,
         f"--remote-debugging-port={port}",
@@ -1277,7 +2619,7 @@ def launch_chrome_with_cdp(chrome_path, user_data_dir, profile_dir_name, port):
     if profile_dir_name:
         args.append(f"--profile-directory={profile_dir_name}")
     # 사용자 체감 위해 크기 고정(최대화는 OS에 따라 무시될 수 있음)
-    args.extend(["--start-maximized", "--window-size=1920,1080", "about:blank"])
+    args.extend(["--start-maximized", "--window-size=1920,1080", start_url])
     # 표준 출력은 필요 없어 숨김
     try:
         proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -1316,6 +2658,361 @@ def open_html_result(html_filename):
         except Exception as e:
             print(f"브라우저 열기 실패. 수동으로 열어주세요: {html_filename}")
 
+def get_or_create_local_chrome_profile():
+    """스크립트 폴더의 로컬 Chrome 프로필 경로 (CHROME_USER_DATA_DIR 로 강제 지정 가능)"""
+    try:
+        override = os.getenv('CHROME_USER_DATA_DIR')
+        if override:
+            os.makedirs(override, exist_ok=True)
+            return override
+    except Exception:
+        pass
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    profile_dir = os.path.join(script_dir, 'chrome-user-data')
+    try:
+        os.makedirs(profile_dir, exist_ok=True)
+    except Exception:
+        pass
+    return profile_dir
+
+# ===== 브라우저 데몬 (warm Chrome 재사용) =====
+NAVER_SHOPPING_HOME = "https://shopping.naver.com/ns/home"
+
+def get_browser_daemon_state_path():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "results", "browser_daemon.json")
+
+def read_browser_daemon_state():
+    try:
+        with open(get_browser_daemon_state_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def load_browser_daemon_state():
+    """연결 가능한 브라우저 데몬 정보 (BROWSER_DAEMON=off 이거나 없거나 응답 없으면 None)"""
+    if os.getenv('BROWSER_DAEMON', 'auto').strip().lower() in ('off', '0', 'false', 'no'):
+        return None
+    state = read_browser_daemon_state()
+    if not state or not state.get('port'):
+        return None
+    return state if wait_cdp_ready(state['port'], timeout=0.5) else None
+
+def run_browser_daemon():
+    """CDP Chrome 을 네이버 쇼핑 홈으로 띄워 두고 상태 파일 기록 후 종료될 때까지 대기 (Ctrl+C 로 종료)
+
+    데몬이 떠 있는 동안 대화형 실행은 Chrome 실행/CDP 대기 없이 이 브라우저에 새 탭으로 바로 연결한다.
+    """
+    state = load_browser_daemon_state()
+    if state:
+        print(f"브라우저 데몬이 이미 실행 중입니다: 포트 {state['port']} (PID {state.get('pid')})")
+        return 0
+    chrome_exe = find_chrome_executable()
+    if not chrome_exe:
+        print("Chrome 실행 파일을 찾지 못했습니다. CHROME_EXE 로 경로를 지정하세요.")
+        return 1
+    
+    profile_strategy = (os.getenv('PROFILE_STRATEGY', 'smart') or 'smart').strip().lower()
+    system_user_data_root = get_chrome_user_data_path() if profile_strategy == 'system' else None
+    if system_user_data_root:
+        user_data_dir = system_user_data_root
+        profile_dir_name = (os.getenv('CHROME_PROFILE_DIR', 'Default') or 'Default').strip()
+    else:
+        user_data_dir = get_or_create_local_chrome_profile()
+        profile_dir_name = None
+    
+    port = find_free_port(9222, 50) or 9222
+    proc = launch_chrome_with_cdp(chrome_exe, user_data_dir, profile_dir_name, port, start_url=NAVER_SHOPPING_HOME)
+    if not proc or not wait_cdp_ready(port, timeout=15.0):
+        print(f"브라우저 데몬 시작 실패: CDP 응답 없음 (포트 {port})")
+        if proc and proc.poll() is None:
+            proc.terminate()
+        return 1
+    
+    state_path = get_browser_daemon_state_path()
+    state = {
+        'port': port,
+        'pid': proc.pid,
+        'user_data_dir': user_data_dir,
+        'profile_dir': profile_dir_name,
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    print(f"브라우저 데몬 실행 중: 포트 {port} (PID {proc.pid}) - 이후 실행은 이 브라우저에 바로 연결합니다.")
+    print("   종료: Ctrl+C 또는 --daemon-stop")
+    try:
+        proc.wait()
+    except KeyboardInterrupt:
+        if proc.poll() is None:
+            proc.terminate()
+    finally:
+        current = read_browser_daemon_state()
+        if current and current.get('pid') == proc.pid:
+            try:
+                os.remove(state_path)
+            except OSError:
+                pass
+    print("브라우저 데몬 종료")
+    return 0
+
+async def close_daemon_browser(port, pid=None):
+    """CDP Browser.close 로 데몬 Chrome 종료 ('cdp'/'pid'/None)
+
+    Browser.close 가 실패하면 CDP 가 보고한 브라우저 프로세스 PID 가 상태 파일의 PID 와 같을 때만 SIGTERM 을 보낸다.
+    """
+    browser_pids = set()
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.connect_over_cdp(f"http://127.0.0.1:{port}")
+            cdp = await browser.new_browser_cdp_session()
+            try:
+                info = await cdp.send('SystemInfo.getProcessInfo')
+                browser_pids = {proc.get('id') for proc in info.get('processInfo', []) if proc.get('type') == 'browser'}
+            except Exception:
+                pass
+            try:
+                await cdp.send('Browser.close')
+            except Exception:
+                pass  # 브라우저가 닫히며 연결이 먼저 끊길 수 있음
+    except Exception:
+        pass
+    deadline = time.time() + 5.0
+    while time.time() < deadline:
+        if not wait_cdp_ready(port, timeout=0.3):
+            return 'cdp'
+        await asyncio.sleep(0.2)
+    if pid and pid in browser_pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+            return 'pid'
+        except OSError:
+            pass
+    return None
+
+def stop_browser_daemon():
+    """실행 중인 브라우저 데몬(Chrome) 종료 - 기록된 CDP 포트가 응답할 때만 종료하고, 응답이 없으면 상태 파일만 정리"""
+    state = read_browser_daemon_state()
+    if not state:
+        print("실행 중인 브라우저 데몬이 없습니다.")
+        return 0
+    port = state.get('port')
+    if not port or not wait_cdp_ready(port, timeout=1.0):
+        print(f"브라우저 데몬이 응답하지 않습니다 (포트 {port}) - 남은 상태 파일만 정리합니다.")
+    else:
+        result = asyncio.run(close_daemon_browser(port, state.get('pid')))
+        if result is None:
+            print(f"브라우저 데몬 종료 실패: 포트 {port} 의 Chrome 을 직접 닫아 주세요.")
+            return 1
+        print(f"브라우저 데몬 종료: 포트 {port} ({'CDP Browser.close' if result == 'cdp' else 'PID ' + str(state.get('pid'))})")
+    try:
+        os.remove(get_browser_daemon_state_path())
+    except OSError:
+        pass
+    return 0
+
+# ===== 무인 배치 모드 =====
+NAVER_SEARCH_URL = "https://search.shopping.naver.com/ns/search?query={}"
+
+def build_search_url(query):
+    """검색어면 네이버 쇼핑 검색 URL로, URL이면 그대로 반환"""
+    query = query.strip()
+    if query.startswith(('http://', 'https://')):
+        return query
+    return NAVER_SEARCH_URL.format(quote_plus(query))
+
+def query_file_prefix(query, index=None):
+    """결과 파일명에 쓸 검색어 조각 (URL이면 query 파라미터 사용)
+
+    슬러그가 같은 검색어나 같은 초에 작성되는 리포트가 서로 덮어쓰지 않도록 배치 순번과 검색어 해시를 붙인다.
+    """
+    text = query.strip()
+    if text.startswith(('http://', 'https://')):
+        params = parse_qs(urlparse(text).query)
+        text = (params.get('query') or params.get('q') or ['url'])[0]
+    slug = re.sub(r'[\\/:*?"<>|\s]+', '_', text).strip('_')[:40]
+    digest = hashlib.sha1(query.strip().encode('utf-8')).hexdigest()[:6]
+    order = f"{index:02d}_" if index is not None else ""
+    return f"naver_{order}{slug or 'query'}_{digest}"
+
+def load_batch_queries(queries=None, query_file=None):
+    """쉼표 구분 목록 또는 줄바꿈 구분 파일에서 검색어/URL 목록 구성"""
+    items = []
+    if queries:
+        items.extend(q.strip() for q in queries.split(','))
+    if query_file:
+        with open(query_file, 'r', encoding='utf-8') as f:
+            items.extend(line.strip() for line in f)
+    return [q for q in items if q and not q.startswith('#')]
+
+class DomainPacer:
+    """도메인별 최소 이동 간격 유지 (여러 탭이 같은 도메인에 동시에 몰리지 않도록 예약 순서대로 대기)"""
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = max(0.0, float(min_interval))
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        domain = urlparse(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, 0.0))
+            self._next_slot[domain] = slot + self.min_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+async def collect_query(page, query, pacer=None):
+    """검색어/URL 하나를 열어 수집 (대화상자/버튼/엔터 대기 없음)"""
+    url = build_search_url(query)
+    capture = None
+    if (os.getenv('COLLECT_MODE', 'scroll') or 'scroll').strip().lower() == 'network':
+        capture = NetworkProductCapture(page).attach()
+    # 검색 결과 첫 로드부터 요청 차단 적용
+    blocker = await ResourceBlocker(page).attach()
+    try:
+        if pacer:
+            await pacer.wait(url)
+        await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+        try:
+            await page.wait_for_selector(CARD_SELECTORS['card'], timeout=15000)
+        except Exception:
+            print(f"[{query}] 상품 카드가 표시되지 않았습니다.")
+        return await collect_products(page, capture, blocker)
+    finally:
+        await blocker.detach()
+        if capture:
+            capture.detach()
+
+async def run_query_pool(context, queries, highlight_keywords=None, concurrency=1, pace=1.0, report_pipeline=None):
+    """한 브라우저 컨텍스트 안에서 탭 N개로 검색어를 나눠 수집 (탭마다 한 검색어씩 collect_products 실행)
+
+    concurrency: 동시에 여는 탭 수, pace: 같은 도메인으로 이동하는 최소 간격(초). 실패한 검색어 목록을 반환한다.
+    report_pipeline 이 있으면 결과 파일 작성은 프로세스 풀에 넘기고 바로 다음 검색어를 수집한다.
+    """
+    queue = asyncio.Queue()
+    for item in enumerate(queries, 1):
+        queue.put_nowait(item)
+    pacer = DomainPacer(pace)
+    failed = []
+    
+    async def worker(worker_id):
+        # 첫 번째 탭은 컨텍스트의 기본 탭을 재사용
+        reuse = worker_id == 0 and bool(context.pages)
+        page = context.pages[0] if reuse else await context.new_page()
+        try:
+            while True:
+                try:
+                    i, query = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = perf_counter()
+                log_progress(f"[{i}/{len(queries)}] (탭 {worker_id + 1}) {query}")
+                try:
+                    products_data = await collect_query(page, query, pacer)
+                    log_keyword_matching(products_data, highlight_keywords)
+                    if products_data and report_pipeline:
+                        skip_reason = result_dump_skip_reason(record_crawl_store(products_data, query))
+                        if skip_reason:
+                            log_progress(f"[{query}] 결과 파일 생략: {skip_reason}")
+                        else:
+                            report_pipeline.submit(query, products_data, i)
+                    elif products_data:
+                        await save_products_data(products_data, highlight_keywords, file_prefix=query_file_prefix(query, i), query=query)
+                    else:
+                        print(f"[{query}] 크롤링 결과가 없습니다.")
+                    log_progress(f"[{query}] {len(products_data)}개 ({perf_counter()-t0:.2f}s)")
+                except Exception as e:
+                    failed.append(query)
+                    print(f"[{query}] 실패: {e}")
+        finally:
+            if not reuse:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+    
+    workers = max(1, min(int(concurrency), len(queries)))
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    return failed
+
+async def run_batch(queries, excel_file_path=None, headless=True, concurrency=1, pace=1.0, report_workers=None):
+    """무인 배치 수집: 검색어/URL 목록을 headless로 순회하며 검색어별 결과 파일 저장 (실패한 검색어 수 반환)
+
+    report_workers: 결과 파일 작성 프로세스 수 (None: 검색어가 여럿이면 CPU 수, 0: 수집 중 순차 저장)
+    """
+    highlight_keywords = []
+    if excel_file_path:
+        print(f"키워드 파일: {excel_file_path}")
+        highlight_keywords = extract_red_background_cells(excel_file_path)
+    
+    user_data_dir = get_or_create_local_chrome_profile()
+    log_progress(f"배치 모드 시작: {len(queries)}개 검색어 | 탭 {concurrency}개 | headless={headless} | User Data: {user_data_dir}")
+    
+    if report_workers is None:
+        report_workers = min(os.cpu_count() or 1, len(queries)) if len(queries) > 1 else 0
+    report_pipeline = ReportPipeline(highlight_keywords, report_workers) if report_workers > 0 else None
+    
+    failed = []
+    async with async_playwright() as p:
+        launch_kwargs = dict(
+            user_data_dir=user_data_dir,
+            headless=headless,
+            viewport={'width': 1920, 'height': 1080},
+            args=[
+                "--window-size=1920,1080",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--disable-blink-features=AutomationControlled",
+                "--exclude-switches=enable-automation",
+            ]
+        )
+        preferred_channel = os.getenv('CHROME_CHANNEL', 'chrome')
+        try:
+            context = await p.chromium.launch_persistent_context(channel=preferred_channel, **launch_kwargs)
+        except Exception as e1:
+            print(f"첫 번째 실행(ch={preferred_channel}) 실패, 기본 Chromium으로 재시도: {e1}")
+            context = await p.chromium.launch_persistent_context(**launch_kwargs)
+        
+        try:
+            await context.add_init_script("""
+                Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+                window.chrome = { runtime: {}, loadTimes: function() {}, csi: function() {}, app: {} };
+                Object.defineProperty(navigator, 'plugins', { get: () => [1, 2, 3, 4, 5] });
+                Object.defineProperty(navigator, 'languages', { get: () => ['ko-KR', 'ko', 'en-US', 'en'] });
+            """)
+            failed = await run_query_pool(context, queries, highlight_keywords, concurrency, pace, report_pipeline)
+        finally:
+            await context.close()
+            if report_pipeline:
+                index_path = await report_pipeline.finish()
+                if index_path:
+                    print(f"배치 색인: {os.path.join('results', os.path.basename(index_path))}")
+    
+    log_progress(f"배치 완료: 성공 {len(queries) - len(failed)}개 / 실패 {len(failed)}개")
+    return len(failed)
+
+def parse_batch_args(argv):
+    parser = argparse.ArgumentParser(description="네이버 쇼핑 무인 배치 수집 (인자 없이 실행하면 대화형 모드)")
+    parser.add_argument("--queries", help="쉼표(,)로 구분한 검색어 또는 검색 URL 목록")
+    parser.add_argument("--query-file", help="줄바꿈으로 구분된 검색어/URL 파일 경로")
+    parser.add_argument("--excel", help="빨간색 배경 키워드를 추출할 엑셀 파일 경로")
+    parser.add_argument("--headed", action="store_true", help="브라우저 창 표시 (기본: headless)")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 수집할 탭 수 (headless 권장)")
+    parser.add_argument("--pace", type=float, default=1.0, help="같은 도메인으로 이동하는 최소 간격(초)")
+    parser.add_argument("--report-workers", type=int, default=None, help="결과 파일 작성 프로세스 수 (기본: CPU 수, 0: 수집 중 순차 저장)")
+    parser.add_argument("--price-report", action="store_true", help="수집 없이 저장소의 가격 이력 요약만 출력")
+    parser.add_argument("--changed-only", action="store_true", help="--price-report 에서 직전 대비 변동된 상품만 출력")
+    parser.add_argument("--daemon", action="store_true", help="로그인 유지용 Chrome 을 띄워 두고 대기 (이후 대화형 실행이 바로 연결)")
+    parser.add_argument("--daemon-stop", action="store_true", help="실행 중인 브라우저 데몬 종료")
+    args = parser.parse_args(argv)
+    if args.daemon or args.daemon_stop:
+        return args
+    if not args.queries and not args.query_file and not args.price_report:
+        parser.error("--queries 또는 --query-file 을 지정하세요.")
+    return args
+
 async def access_naver_shopping_optimized():
     """네이버 쇼핑 크롤링 실행"""
     print("=" * 60)
@@ -1352,24 +3049,6 @@ async def access_naver_shopping_optimized():
     print("🚀 네이버 쇼핑 크롤링 시작")
     print("=" * 60)
     
-    # 프로필 전략: local(기본) | system | smart(system 실패 시 local)
-    def get_or_create_local_chrome_profile():
-        try:
-            # 환경변수로 경로를 강제 지정할 수 있음
-            override = os.getenv('CHROME_USER_DATA_DIR')
-            if override:
-                os.makedirs(override, exist_ok=True)
-                return override
-        except Exception:
-            pass
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        profile_dir = os.path.join(script_dir, 'chrome-user-data')
-        try:
-            os.makedirs(profile_dir, exist_ok=True)
-        except Exception:
-            pass
-        return profile_dir
-
     # 전략/프로필 디렉터리 결정
     profile_strategy = (os.getenv('PROFILE_STRATEGY', 'smart') or 'smart').strip().lower()
     chrome_profile_dir_name = (os.getenv('CHROME_PROFILE_DIR', 'Default') or 'Default').strip()
@@ -1387,51 +3066,67 @@ async def access_naver_shopping_optimized():
     
     log_progress("Playwright 컨텍스트 시작")
     browser = None
+    daemon_state = None
     async with async_playwright() as p:
         try:
             print("Chrome 실행 중...")
+            # 브라우저 데몬이 떠 있으면 새 탭으로 바로 연결 (Chrome 실행/CDP 대기 생략)
+            daemon_state = load_browser_daemon_state()
+            if daemon_state:
+                try:
+                    browser = await p.chromium.connect_over_cdp(f"http://127.0.0.1:{daemon_state['port']}")
+                    context = browser.contexts[0] if browser.contexts else await browser.new_context()
+                    page = await context.new_page()
+                    await page.set_viewport_size({'width': 1920, 'height': 1080})
+                    print(f"브라우저 데몬 연결: 포트 {daemon_state['port']}")
+                except Exception as _daemon_e:
+                    print(f"브라우저 데몬 연결 실패({_daemon_e}), Chrome 을 새로 실행합니다.")
+                    browser = None
+                    daemon_state = None
+            
             # 0) 자동 CDP 시도: 사용자가 별도 준비하지 않아도, 이 코드가 직접 크롬을 원격 디버깅으로 띄우고 붙는다.
             auto_cdp_proc = None
-            try:
-                chrome_exe = find_chrome_executable()
-                if chrome_exe:
-                    # system 전략이면 시스템 프로필로, 아니면 로컬 프로필로 CDP 띄움
-                    if profile_strategy == 'system':
-                        cdp_user_data = system_user_data_root
-                        cdp_profile_dir = chrome_profile_dir_name
-                    else:
-                        cdp_user_data = user_data_dir
-                        cdp_profile_dir = None if profile_strategy == 'local' else chrome_profile_dir_name
-                    port = find_free_port(9222, 50) or 9222
-                    auto_cdp_proc = launch_chrome_with_cdp(chrome_exe, cdp_user_data, cdp_profile_dir, port)
-                    if auto_cdp_proc and wait_cdp_ready(port, timeout=8.0):
-                        browser = await p.chromium.connect_over_cdp(f"http://127.0.0.1:{port}")
-                        # 페이지 생성
-                        context_list = browser.contexts
-                        if context_list:
-                            page = await context_list[0].new_page()
+            if browser is None:
+                try:
+                    chrome_exe = find_chrome_executable()
+                    if chrome_exe:
+                        # system 전략이면 시스템 프로필로, 아니면 로컬 프로필로 CDP 띄움
+                        if profile_strategy == 'system':
+                            cdp_user_data = system_user_data_root
+                            cdp_profile_dir = chrome_profile_dir_name
+                        else:
+                            cdp_user_data = user_data_dir
+                            cdp_profile_dir = None if profile_strategy == 'local' else chrome_profile_dir_name
+                        port = find_free_port(9222, 50) or 9222
+                        auto_cdp_proc = launch_chrome_with_cdp(chrome_exe, cdp_user_data, cdp_profile_dir, port)
+                        if auto_cdp_proc and wait_cdp_ready(port, timeout=8.0):
+                            browser = await p.chromium.connect_over_cdp(f"http://127.0.0.1:{port}")
+                            # 페이지 생성
+                            context_list = browser.contexts
+                            if context_list:
+                                page = await context_list[0].new_page()
+                            else:
+                                context = await browser.new_context()
+                                page = await context.new_page()
+                            await page.set_viewport_size({'width': 1920, 'height': 1080})
+                            print(f"자동 CDP 연결 성공: 포트 {port}, 실행 중 Chrome에 부착하여 진행합니다.")
                         else:
-                            context = await browser.new_context()
-                            page = await context.new_page()
-                        await page.set_viewport_size({'width': 1920, 'height': 1080})
-                        print(f"자동 CDP 연결 성공: 포트 {port}, 실행 중 Chrome에 부착하여 진행합니다.")
+                            # 준비 실패 시 프로세스가 떠 있으면 정리
+                            if auto_cdp_proc and auto_cdp_proc.poll() is None:
+                                try:
+                                    auto_cdp_proc.terminate()
+                                except Exception:
+                                    pass
+                            auto_cdp_proc = None
                     else:
-                        # 준비 실패 시 프로세스가 떠 있으면 정리
+                        print("Chrome 실행 파일을 찾지 못해 자동 CDP를 건너뜁니다.")
+                except Exception as _auto_cdp_e:
+                    print(f"자동 CDP 시도 실패({_auto_cdp_e}), smart 전략으로 진행합니다.")
+                    try:
                         if auto_cdp_proc and auto_cdp_proc.poll() is None:
-                            try:
-                                auto_cdp_proc.terminate()
-                            except Exception:
-                                pass
-                        auto_cdp_proc = None
-                else:
-                    print("Chrome 실행 파일을 찾지 못해 자동 CDP를 건너뜁니다.")
-            except Exception as _auto_cdp_e:
-                print(f"자동 CDP 시도 실패({_auto_cdp_e}), smart 전략으로 진행합니다.")
-                try:
-                    if auto_cdp_proc and auto_cdp_proc.poll() is None:
-                        auto_cdp_proc.terminate()
-                except Exception:
-                    pass
+                            auto_cdp_proc.terminate()
+                    except Exception:
+                        pass
                 
             if browser is None:
                 # 1차 시도: 설치된 Chrome으로 실행(channel='chrome')
@@ -1482,7 +3177,8 @@ async def access_naver_shopping_optimized():
             
             log_progress("브라우저 생성 완료")
             print("네이버 쇼핑 접속 중...")
-            await page.goto("https://shopping.naver.com/ns/home", wait_until='networkidle', timeout=30000)
+            # 데몬 브라우저는 이미 캐시/세션이 데워져 있어 DOM 로드까지만 대기
+            await page.goto(NAVER_SHOPPING_HOME, wait_until='domcontentloaded' if daemon_state else 'networkidle', timeout=30000)
             log_progress("네이버 쇼핑 페이지 로드 완료")
             print("페이지 로드 완료! 원하는 카테고리나 검색을 수행한 후 버튼을 클릭하세요.")
             
@@ -1490,7 +3186,7 @@ async def access_naver_shopping_optimized():
             log_progress("사용자 시작 신호 수신, 수집 시작")
             print("크롤링 시작... (무제한 모드)")
             t0 = perf_counter()
-            products_data = await scroll_and_collect(page)
+            products_data = await collect_products(page)
             log_progress(f"수집 완료: {len(products_data)}개 ({perf_counter()-t0:.2f}s)")
             
             if products_data:
@@ -1563,12 +3259,37 @@ async def access_naver_shopping_optimized():
                 print("- 실패 시 모든 Chrome/Chromium 프로세스 종료 후 재시도 또는 'chrome-user-data' 삭제로 초기화")
         finally:
             try:
-                if browser:
+                if daemon_state:
+                    # 데몬 브라우저는 유지하고 이번 실행에서 연 탭만 닫음
+                    if 'page' in locals():
+                        await page.close()
+                elif browser:
                     await browser.close()
             except Exception:
                 pass
 
 if __name__ == "__main__":
+    # 인자가 있으면 무인 배치 모드 (예: python 스크립트.py --queries "무선마우스,키보드" --excel 키워드.xlsx)
+    if len(sys.argv) > 1:
+        batch_args = parse_batch_args(sys.argv[1:])
+        if batch_args.daemon:
+            sys.exit(run_browser_daemon())
+        if batch_args.daemon_stop:
+            sys.exit(stop_browser_daemon())
+        if batch_args.price_report:
+            print_price_report(changed_only=batch_args.changed_only)
+            sys.exit(0)
+        batch_queries = load_batch_queries(batch_args.queries, batch_args.query_file)
+        failed_count = asyncio.run(run_batch(
+            batch_queries,
+            batch_args.excel,
+            headless=not batch_args.headed,
+            concurrency=batch_args.concurrency,
+            pace=batch_args.pace,
+            report_workers=batch_args.report_workers,
+        ))
+        sys.exit(1 if failed_count else 0)
+    
     print("=" * 70)
     print("🛍️ 네이버 쇼핑 크롤링 도구 v7.0 - 키워드 하이라이트 버전")
     print("=" * 70)
@@ -1,11 +1,14 @@
 import os
+import re
 import csv
 import sys
 import time
 import json
 import random
+import shutil
 import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
@@ -14,6 +17,13 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+# 저장소 루트의 공용 모듈 (네이버 스크립트와 같은 적응형 스크롤/저장소 스키마)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from crawl_common import (
+	FEED_SCROLL_CALL_JS, ScrollController, feed_scroll_args,
+	result_dump_skip_reason, upsert_store_records,
+)
+
 
 def log(msg: str):
 	ts = time.strftime("%H:%M:%S")
@@ -135,27 +145,77 @@ def navigate_and_search(driver, keyword: str):
 	raise RuntimeError("검색결과 로드에 실패했습니다.")
 
 
-def incremental_scroll(driver, target_count: int = 60, max_scrolls: int = 20):
-	last_h = 0
-	same_count = 0
-	for i in range(max_scrolls):
-		driver.execute_script("window.scrollBy(0, document.body.scrollHeight);")
-		human_delay(0.8, 1.6)
-		new_h = driver.execute_script("return document.body.scrollHeight")
-		if new_h == last_h:
-			same_count += 1
-		else:
-			same_count = 0
-		last_h = new_h
+# 상품 카드 셀렉터 (피드 끝/더보기 판정 셀렉터는 crawl_common.FEED_SELECTORS["coupang"])
+CARD_CSS = "li.search-product, a.search-product-link[href*='/vp/products']"
 
-		cards = driver.find_elements(By.CSS_SELECTOR, "li.search-product, a.search-product-link[href*='/vp/products']")
-		if len(cards) >= target_count:
-			break
-		if same_count >= 2:
+
+def count_cards(driver) -> int:
+	return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", CARD_CSS)
+
+
+def incremental_scroll(driver, target_count: int = 60, max_scrolls: int = 20):
+	"""카드 도착 속도에 맞춰 스크롤 (목표 개수/피드 끝/시간 한도/최대 횟수 중 먼저 도달 시 종료)"""
+	# 쿠팡 검색 결과는 한 페이지 목록이라 처음부터 크게 넘김
+	controller = ScrollController.from_env(product_budget=target_count, step=2.0, max_rounds=max_scrolls)
+	total = count_cards(driver)
+	while True:
+		feed = driver.execute_script(FEED_SCROLL_CALL_JS, feed_scroll_args("coupang", CARD_CSS, controller))
+		# 사람처럼 보이도록 대기 시간에 흔들림 추가
+		human_delay(controller.wait * 0.85, controller.wait * 1.25)
+		count = count_cards(driver)
+		# 페이지 이동 영역은 처음부터 렌더링되어 있으므로 바닥까지 내려온 뒤에만 피드 끝으로 인정
+		end_of_feed = feed["end"] and feed["atBottom"]
+		keep_scrolling = controller.observe(count - total, count, feed["atBottom"], end_of_feed, feed["more"])
+		total = count
+		if not keep_scrolling:
 			break
+	log(f"스크롤 종료: {controller.stop_reason} ({controller.rounds}회, 카드 {total}개)")
+
+
+# 카드 추출 스크립트: find_element/get_attribute 왕복 대신 execute_script 1회로 모든 카드 추출
+# (extract_products_by_element 와 같은 카드/필드 셀렉터 우선순위)
+EXTRACT_PRODUCTS_JS = """
+const limit = arguments[0];
+const q = (sel) => Array.from(document.querySelectorAll(sel));
+let cards = q("li.search-product");
+if (!cards.length) cards = q("ul#productList li").concat(q("ul.search-product-list li"));
+if (!cards.length) cards = q("a.search-product-link[href*='/vp/products']");
+
+const text = (el) => (el.innerText || el.textContent || "").trim();
+const items = [];
+for (const el of cards) {
+	const nameEl = el.querySelector(".name, .title, .prod-name");
+	const priceEl = el.querySelector(".price-value, strong.price-value, .price, .total-price strong, .prod-price, .price-info, em.sale-price");
+	const aEl = el.querySelector("a[href*='/vp/products'], a[href*='/products/']");
+	const imgEl = el.querySelector("img");
+	const name = nameEl ? text(nameEl) : null;
+	const link = aEl ? aEl.href : (el.href || null);
+	if (!name && !link) continue;
+	items.push({
+		name: name,
+		price: priceEl ? text(priceEl) : null,
+		link: link,
+		image: imgEl && imgEl.getAttribute("src") ? imgEl.src : null,
+	});
+	if (items.length >= limit) break;
+}
+return items;
+"""
 
 
 def extract_products(driver, limit: int = 50):
+	try:
+		items = driver.execute_script(EXTRACT_PRODUCTS_JS, limit)
+	except Exception as e:
+		log(f"스크립트 추출 실패, 요소 단위 추출로 전환: {e}")
+		return extract_products_by_element(driver, limit=limit)
+	return [
+		{"name": it.get("name"), "price": it.get("price"), "link": it.get("link"), "image": it.get("image")}
+		for it in (items or [])
+	]
+
+
+def extract_products_by_element(driver, limit: int = 50):
 	items = []
 	# 다양한 레이아웃 대응: 우선순위 순으로 병합
 	cards = driver.find_elements(By.CSS_SELECTOR, "li.search-product")
@@ -253,6 +313,35 @@ def save_results_multi(rows, out_prefix: str, out_dir: Path):
 	return str(csv_path), str(json_path)
 
 
+def coupang_product_key(row):
+	"""상품 식별 키: /vp/products/{id} 우선, 없으면 링크 또는 상품명"""
+	link = row.get("link") or ""
+	m = re.search(r"/vp/products/(\d+)", link)
+	if m:
+		return f"coupang:{m.group(1)}"
+	return f"coupang:{link or row.get('name') or ''}"
+
+
+def upsert_store(rows, db_path: Path):
+	"""수집 행을 로컬 저장소에 upsert (crawl_common 공용 스키마 - 네이버 스크립트와 같은 파일을 가리키면 함께 사용 가능)
+
+	처음 보거나 가격이 바뀐 경우에만 가격 이력을 추가하고, 저장소 반영 통계를 반환한다.
+	"""
+	records = [{
+		"product_key": coupang_product_key(r),
+		"source": "coupang",
+		"name": r.get("name"),
+		"mall": None,
+		"link": r.get("link"),
+		"thumbnail": r.get("image") or "",
+		"price": r.get("price") or "",
+		"delivery": None,
+		"query": r.get("keyword"),
+	} for r in rows]
+	stats, _ = upsert_store_records(records, str(db_path))
+	return stats
+
+
 def search_one_keyword(driver, keyword: str, limit: int):
 	log(f"[{keyword}] 검색 시작")
 	ok = navigate_and_search(driver, keyword)
@@ -266,6 +355,68 @@ def search_one_keyword(driver, keyword: str, limit: int):
 	return rows
 
 
+def clone_profile(profile_dir: Path, worker_id: int) -> Path:
+	"""워커별 프로필 복제본 (원본의 쿠키/세션 재사용, 락/캐시 제외). 이미 있으면 그대로 재사용"""
+	target = profile_dir.parent / f"{profile_dir.name}-w{worker_id}"
+	if profile_dir.exists() and not target.exists():
+		shutil.copytree(
+			profile_dir,
+			target,
+			ignore=shutil.ignore_patterns("Singleton*", "lockfile", "*.lock", "Cache", "Code Cache", "GPUCache"),
+		)
+	target.mkdir(parents=True, exist_ok=True)
+	return target
+
+
+def run_keyword_worker(worker_id: int, keywords, profile_dir: str, headless: bool, limit: int):
+	"""프로세스 워커: 자기 프로필로 드라이버를 띄워 맡은 키워드를 순서대로 수집"""
+	# 드라이버 패치/기동이 한꺼번에 몰리지 않도록 워커별로 시차를 둠
+	time.sleep(worker_id * 2.0)
+	rows = []
+	driver = None
+	try:
+		driver = build_driver(Path(profile_dir), headless=headless)
+		for kw in keywords:
+			try:
+				rows.extend(search_one_keyword(driver, kw, limit=limit))
+				human_delay(1.0, 2.0)
+			except Exception as e:
+				log(f"[w{worker_id}][{kw}] 실패: {e}")
+				continue
+	finally:
+		if driver:
+			try:
+				driver.quit()
+			except Exception:
+				pass
+	return rows
+
+
+def crawl_with_workers(kw_list, workers: int, profile_dir: Path, headless: bool, limit: int):
+	"""키워드를 N개 프로세스로 나눠 수집하고, 원래 키워드 순서대로 행을 병합 (kw_list 는 중복 제거된 목록)"""
+	shards = [kw_list[i::workers] for i in range(workers)]
+	shards = [s for s in shards if s]
+	log(f"워커 {len(shards)}개로 키워드 {len(kw_list)}개 분할 수집")
+
+	rows_by_kw = {}
+	with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+		futures = {
+			pool.submit(run_keyword_worker, i, shard, str(clone_profile(profile_dir, i)), headless, limit): i
+			for i, shard in enumerate(shards)
+		}
+		for fut in as_completed(futures):
+			try:
+				for r in fut.result():
+					rows_by_kw.setdefault(r.get("keyword"), []).append(r)
+			except Exception as e:
+				log(f"[w{futures[fut]}] 워커 실패: {e}")
+
+	all_rows = []
+	for kw in kw_list:
+		all_rows.extend(rows_by_kw.get(kw, []))
+	return all_rows
+
+
 def main():
 	parser = argparse.ArgumentParser(description="쿠팡 검색 크롤러 (undetected-chromedriver)")
 	parser.add_argument("keyword", nargs="?", help="검색 키워드 (단일)")
@@ -276,6 +427,8 @@ def main():
 	parser.add_argument("--keywords", help="쉼표(,)로 구분한 다중 키워드 목록")
 	parser.add_argument("--kw-file", help="줄바꿈으로 구분된 키워드 파일 경로")
 	parser.add_argument("--batch", action="store_true", help="키워드 미지정 시 기본 5개 샘플로 배치 실행")
+	parser.add_argument("--workers", type=int, default=1, help="병렬 프로세스 수 (워커마다 --profile 복제본 사용)")
+	parser.add_argument("--dumps", choices=["changed", "always", "off"], help="CSV/JSON 작성 정책 (기본: RESULT_DUMPS 환경변수 또는 changed - 저장소 대비 신규/변동이 있을 때만)")
 	args = parser.parse_args()
 
 	profile_dir = Path(args.profile)
@@ -297,29 +450,49 @@ def main():
 		log("키워드를 지정하지 않아 기본 샘플 5개로 실행합니다. --batch 사용 가능")
 		kw_list = ["에어팟", "허리보조쿠션", "커피머신", "게이밍 마우스", "캠핑 의자"]
 
+	# 중복 키워드는 한 번만 수집 (순서 유지) - 순차/병렬 경로 모두 동일
+	kw_list = list(dict.fromkeys(kw_list))
+	workers = max(1, min(args.workers, len(kw_list)))
 	driver = None
 	try:
-		driver = build_driver(profile_dir, headless=args.headless)
-
-		all_rows = []
-		for kw in kw_list:
-			try:
-				rows = search_one_keyword(driver, kw, limit=args.limit)
-				all_rows.extend(rows)
-				human_delay(1.0, 2.0)
-			except Exception as e:
-				log(f"[{kw}] 실패: {e}")
-				continue
-
-		ts = time.strftime("%Y%m%d_%H%M%S")
-		if len(kw_list) == 1:
-			prefix = f"coupang_{kw_list[0]}_{ts}"
-			csv_path, json_path = save_results(all_rows, prefix, out_dir)
+		if workers > 1:
+			all_rows = crawl_with_workers(kw_list, workers, profile_dir, args.headless, args.limit)
 		else:
-			prefix = f"coupang_batch_{ts}"
-			csv_path, json_path = save_results_multi(all_rows, prefix, out_dir)
+			driver = build_driver(profile_dir, headless=args.headless)
 
-		log(f"저장 완료: {csv_path}, {json_path}")
+			all_rows = []
+			for kw in kw_list:
+				try:
+					rows = search_one_keyword(driver, kw, limit=args.limit)
+					all_rows.extend(rows)
+					human_delay(1.0, 2.0)
+				except Exception as e:
+					log(f"[{kw}] 실패: {e}")
+					continue
+
+		# 저장소가 기본 기록처 - CSV/JSON 은 --dumps 정책에 따라 작성
+		stats = None
+		try:
+			store_path = Path(os.getenv("CRAWL_STORE_PATH") or out_dir / "crawl_store.sqlite3")
+			stats = upsert_store(all_rows, store_path)
+			duplicate_text = f" · 중복 {stats['duplicate']}" if stats["duplicate"] else ""
+			log(f"저장소 반영: 신규 {stats['new']} · 변동 {stats['changed']} · 변동없음 {stats['unchanged']}{duplicate_text}")
+		except Exception as e:
+			log(f"저장소 저장 오류: {e}")
+
+		skip_reason = result_dump_skip_reason(stats, args.dumps)
+		if skip_reason:
+			log(f"결과 파일 생략: {skip_reason}")
+		else:
+			ts = time.strftime("%Y%m%d_%H%M%S")
+			if len(kw_list) == 1:
+				prefix = f"coupang_{kw_list[0]}_{ts}"
+				csv_path, json_path = save_results(all_rows, prefix, out_dir)
+			else:
+				prefix = f"coupang_batch_{ts}"
+				csv_path, json_path = save_results_multi(all_rows, prefix, out_dir)
+
+			log(f"저장 완료: {csv_path}, {json_path}")
 	finally:
 		if driver:
 			try: